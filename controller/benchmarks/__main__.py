@@ -0,0 +1,62 @@
+"""Run every benchmark and report the results as JSON.
+
+Run from the controller directory using ``PYTHONPATH=src python3 -m benchmarks``. Benchmarks whose
+dependencies cannot be imported, like the gz bindings outside of the controller image, are
+reported as skipped.
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import importlib
+import json
+import platform
+import sys
+from typing import Any
+
+BENCHMARKS: tuple[str, ...] = ("automaton", "handlers", "heading", "messages", "simulation")
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="benchmarks")
+    parser.add_argument("-o", "--output", help="File to write the results to instead of stdout")
+    # The names are checked here since argparse also checks the empty default against the choices
+    parser.add_argument("names", nargs="*", metavar="name", help=f"Benchmarks to run, from {', '.join(BENCHMARKS)}")
+    args = parser.parse_args()
+    unknown = [name for name in args.names if name not in BENCHMARKS]
+
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(unknown)}")
+
+    names = args.names or list(BENCHMARKS)
+
+    report: dict[str, Any] = {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "benchmarks": {},
+    }
+
+    for name in names:
+        print(f"Running benchmark {name}", file=sys.stderr)
+
+        try:
+            module = importlib.import_module(f".{name}", __package__)
+        except ImportError as e:
+            report["benchmarks"][name] = {"skipped": str(e)}
+            continue
+
+        report["benchmarks"][name] = module.run()
+
+    output = json.dumps(report, indent=2)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Steps per second of the automaton implementations over a full S1 to S6 mission.
+
+Run from the controller directory using ``PYTHONPATH=src python3 -m benchmarks.automaton``.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+import controller.attacks as atk
+import controller.automaton as ha
+import controller.kinematic as kin
+
+from .timing import best
+
+STEP_SIZE: float = 0.01
+
+
+@dataclass()
+class Replay(ha.Model):
+    """Model that replays a recorded trajectory, advancing one sample per step."""
+
+    positions: list[ha.Position] = field()
+    headings: list[float] = field()
+    index: int = field(default=0, init=False)
+
+    @property
+    def position(self) -> ha.Position:
+        return self.positions[self.index]
+
+    @property
+    def heading(self) -> float:
+        return self.headings[self.index]
+
+    @property
+    def heading_real(self) -> float:
+        return self.headings[self.index]
+
+
+def mission(step_size: float = STEP_SIZE) -> Replay:
+    """Record the trajectory of a kinematic rover completing a mission without attacks."""
+
+    vehicle = kin.ackermann(magnet=atk.StationaryMagnet(0.0))
+    controller = ha.Automaton(vehicle, step_size)
+    positions: list[ha.Position] = []
+    headings: list[float] = []
+
+    while not controller.state.is_terminal():
+        positions.append(vehicle.position)
+        headings.append(vehicle.heading)
+        vehicle.velocity = 0.0 if controller.action is ha.Action.STOP else 5.0
+        vehicle.steering_angle = 0.5 if controller.action is ha.Action.TURN else 0.0
+        controller.step(None)
+        vehicle.step(step_size)
+
+    return Replay(positions, headings)
+
+
+def steps_per_second(
+    factory: Callable[[ha.Model, float], ha.Automaton | ha.CompiledAutomaton],
+    model: Replay,
+    *,
+    repeat: int = 20,
+) -> float:
+    def replay():
+        model.index = 0
+        controller = factory(model, STEP_SIZE)
+
+        for model.index in range(len(model.positions)):
+            controller.step(None)
+
+    return len(model.positions) / best(replay, repeat=repeat)
+
+
+def run() -> dict[str, float]:
+    model = mission()
+
+    return {
+        "mission_steps": len(model.positions),
+        "automaton_steps_per_sec": steps_per_second(ha.Automaton, model),
+        "compiled_automaton_steps_per_sec": steps_per_second(ha.CompiledAutomaton, model),
+    }
+
+
+def main():
+    model = mission()
+    print(f"Mission length: {len(model.positions)} steps")
+
+    for name, factory in [("Automaton", ha.Automaton), ("CompiledAutomaton", ha.CompiledAutomaton)]:
+        print(f"{name:>20}: {steps_per_second(factory, model):,.0f} steps/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Cost of decoding pose and magnetometer messages with the rover handlers.
+
+The messages are synthetic protobufs, so only the gz message and transport bindings are required,
+not a running Gazebo server.
+"""
+
+from __future__ import annotations
+
+from gz.msgs10.magnetometer_pb2 import Magnetometer
+from gz.msgs10.pose_v_pb2 import Pose_V
+
+import rover
+
+from .timing import best
+
+ENTITIES: tuple[int, ...] = (1, 10, 100, 1000)
+NUMBER: int = 1000
+
+
+def pose_message(entities: int, rover_index: int) -> Pose_V:
+    """Create a pose message of `entities` entities where the rover has index `rover_index`."""
+
+    msg = Pose_V()
+    msg.header.stamp.sec = 12
+    msg.header.stamp.nsec = 500_000_000
+
+    for index in range(entities):
+        pose = msg.pose.add()
+        pose.id = index + 1
+        pose.name = "ackermann" if index == rover_index else f"entity_{index}"
+        pose.position.x = 1.0
+        pose.position.y = 2.0
+        pose.orientation.w = 1.0
+
+    return msg
+
+
+def magnetometer_message() -> Magnetometer:
+    msg = Magnetometer()
+    msg.header.stamp.sec = 12
+    msg.field_tesla.x = 0.2
+    msg.field_tesla.y = 0.4
+    msg.field_tesla.z = -0.1
+
+    return msg
+
+
+def run() -> dict[str, float]:
+    results: dict[str, float] = {}
+
+    for entities in ENTITIES:
+        # The rover is placed last, which is the worst case for the first scan of a message
+        msg = pose_message(entities, entities - 1)
+        handler = rover.PoseHandler("ackermann")
+        results[f"pose_handler_{entities}_entities_sec"] = best(lambda: handler(msg), number=NUMBER)
+
+        demux = rover.PoseDemultiplexer({"ackermann": rover.PoseHandler("ackermann")})
+        results[f"pose_demultiplexer_{entities}_entities_sec"] = best(lambda: demux(msg), number=NUMBER)
+
+    magnetometer = rover.MagnetometerHandler()
+    msg_ = magnetometer_message()
+    results["magnetometer_handler_sec"] = best(lambda: magnetometer(msg_), number=NUMBER)
+
+    return results
@@ -0,0 +1,39 @@
+"""Cost of reading the heading of a rover with each type of magnet.
+
+The kinematic vehicle is used in place of the NGC rover so that the gz bindings are not needed,
+which only changes how the heading before the magnet offset is computed.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import numpy.random as rand
+
+import controller.attacks as atk
+import controller.kinematic as kin
+
+from .timing import best
+
+NUMBER: int = 1000
+
+
+def magnets() -> dict[str, atk.Magnet]:
+    array = atk.MagnetArray(rand.default_rng(0).uniform(0.0, 8.0, (16, 2)), np.full(16, 0.8), rand.default_rng(1))
+
+    return {
+        "stationary": atk.StationaryMagnet(0.0),
+        "gaussian": atk.GaussianMagnet(4.0, 4.0, rand.default_rng(0)),
+        "array_16": array,
+        "field_map_16": atk.FieldMap.from_array(array, (0.0, 0.0, 8.0, 8.0)),
+    }
+
+
+def run() -> dict[str, float]:
+    results: dict[str, float] = {}
+
+    for name, magnet in magnets().items():
+        vehicle = kin.Ackermann(magnet, 1.0, 2.0)
+        results[f"heading_{name}_sec"] = best(lambda: vehicle.heading, number=NUMBER)
+        results[f"snapshot_{name}_sec"] = best(vehicle.snapshot, number=NUMBER)
+
+    return results
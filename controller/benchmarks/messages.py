@@ -0,0 +1,56 @@
+"""Size and encoding time of simulation results."""
+
+from __future__ import annotations
+
+import pickle
+from itertools import repeat
+
+import controller.messages as msgs
+from controller import attacks as atk
+from controller import automaton as ha
+from controller import kinematic as kin
+
+from .timing import best
+
+FREQUENCY: int = 100
+
+
+def history() -> list[msgs.Step]:
+    """Record the steps of a kinematic mission without attacks."""
+
+    step_size = 1.0 / FREQUENCY
+    vehicle = kin.ackermann(magnet=atk.StationaryMagnet(0.0))
+    controller = ha.Automaton(vehicle, step_size)
+    commands = repeat(None)
+    steps: list[msgs.Step] = []
+
+    while True:
+        snapshot = vehicle.snapshot()
+        steps.append(msgs.Step(snapshot.clock, snapshot.position, snapshot.heading, snapshot.roll, controller.state))
+
+        if controller.state.is_terminal():
+            return steps
+
+        vehicle.velocity = 0.0 if controller.action is ha.Action.STOP else 5.0
+        vehicle.steering_angle = 0.5 if controller.action is ha.Action.TURN else 0.0
+        controller.step(next(commands), snapshot)
+        vehicle.step(step_size)
+
+
+def run() -> dict[str, float]:
+    steps = history()
+    result = msgs.Result.from_steps(steps)
+    encoded = result.encode()
+    pickled = pickle.dumps(result)
+
+    return {
+        "steps": len(steps),
+        "steps_pickle_bytes": len(pickle.dumps(steps)),
+        "result_encoded_bytes": len(encoded),
+        "result_pickle_bytes": len(pickled),
+        "result_from_steps_sec": best(lambda: msgs.Result.from_steps(steps)),
+        "result_encode_sec": best(result.encode),
+        "result_decode_sec": best(lambda: msgs.Result.decode(encoded)),
+        "result_pickle_roundtrip_sec": best(lambda: pickle.loads(pickle.dumps(result))),
+        "result_history_sec": best(lambda: result.history),
+    }
@@ -0,0 +1,59 @@
+"""End to end cost of a simulation using the kinematic vehicle in place of Gazebo.
+
+`main` imports the gz bindings, so this drives the same control tick as `main.run` does with the
+kinematic backend: take a snapshot, record a step, actuate the vehicle, step the automaton and
+advance the vehicle, then build the result from the recorded steps.
+"""
+
+from __future__ import annotations
+
+import numpy.random as rand
+
+import controller.attacks as atk
+import controller.automaton as ha
+import controller.kinematic as kin
+import controller.messages as msgs
+
+from .timing import best
+
+FREQUENCY: int = 100
+
+
+def simulate(magnet: atk.Magnet, step_size: float = 1.0 / FREQUENCY) -> msgs.Result:
+    vehicle = kin.ackermann(magnet=magnet)
+    controller = ha.Automaton(vehicle, step_size)
+    speed = atk.FixedSpeed(5.0)
+    history: list[msgs.Step] = []
+
+    while True:
+        magnet.seek(len(history))
+        snapshot = vehicle.snapshot()
+        history.append(msgs.Step(snapshot.clock, snapshot.position, snapshot.heading, snapshot.roll, controller.state))
+        action = controller.action
+        vehicle.velocity = 0.0 if action is ha.Action.STOP else speed.speed(snapshot.clock)
+        vehicle.steering_angle = 0.5 if action is ha.Action.TURN else 0.0
+        vehicle.flush()
+
+        if controller.state.is_terminal():
+            break
+
+        controller.step(None, snapshot)
+        vehicle.step(step_size)
+
+    return msgs.Result.from_steps(history)
+
+
+def run() -> dict[str, float]:
+    results: dict[str, float] = {}
+    magnets: dict[str, atk.Magnet] = {
+        "stationary": atk.StationaryMagnet(0.0),
+        "gaussian": atk.GaussianMagnet(4.0, 4.0, rand.default_rng(0)),
+    }
+
+    for name, magnet in magnets.items():
+        steps = len(simulate(magnet).time)
+        seconds = best(lambda: simulate(magnet), repeat=5)
+        results[f"run_{name}_steps"] = steps
+        results[f"run_{name}_steps_per_sec"] = steps / seconds
+
+    return results
@@ -0,0 +1,12 @@
+"""Timing helpers shared by the benchmarks."""
+
+from __future__ import annotations
+
+import timeit
+from collections.abc import Callable
+
+
+def best(fn: Callable[[], object], *, number: int = 1, repeat: int = 20) -> float:
+    """Return the best time in seconds of a single call of `fn` over `repeat` rounds."""
+
+    return min(timeit.repeat(fn, number=number, repeat=repeat)) / number
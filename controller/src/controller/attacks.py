@@ -1,10 +1,12 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from math import pi, pow
+from dataclasses import dataclass, field
+from math import floor, pi, pow
 from typing import Protocol
 
+import numpy as np
 from numpy import random
+from numpy.typing import ArrayLike, NDArray
 
 from .automaton import Model, euclidean_distance
 
@@ -13,6 +15,29 @@ class Magnet(Protocol):
     def offset(self, time: float, model: Model) -> float:
         ...
 
+    def seek(self, step: int):
+        """Select the control step used for the noise of the following offsets."""
+
+
+class NoiseStream:
+    """Standard normal noise indexed by control step.
+
+    The noise is drawn from `rng` in blocks of `block` values as steps are requested, so every
+    read of the same step returns the same value and the noise of a step only depends on the
+    state of the generator, not on how many times the offset was computed.
+    """
+
+    def __init__(self, rng: random.Generator, block: int = 1024):
+        self._rng = rng
+        self._block = block
+        self._buffer: NDArray[np.float64] = np.empty(0)
+
+    def __getitem__(self, step: int) -> float:
+        while step >= len(self._buffer):
+            self._buffer = np.concatenate((self._buffer, self._rng.standard_normal(self._block)))
+
+        return float(self._buffer[step])
+
 
 @dataclass()
 class StationaryMagnet(Magnet):
@@ -27,6 +52,14 @@ class GaussianMagnet(Magnet):
     x: float
     y: float
     rng: random.Generator
+    _noise: NoiseStream = field(init=False, repr=False)
+    _step: int = field(default=0, init=False, repr=False)
+
+    def __post_init__(self):
+        self._noise = NoiseStream(self.rng)
+
+    def seek(self, step: int):
+        self._step = step
 
     def offset(self, time: float, model: Model) -> float:
         mu_0 = 4 * pi * 10e-7
@@ -35,7 +68,119 @@ class GaussianMagnet(Magnet):
         d = euclidean_distance(p, model.position)
         scale = (mu_0 + m) / pow(d, 3)
 
-        return self.rng.normal(0.0, 1.0) * scale
+        return self._noise[self._step] * scale
+
+
+def _scale(magnitude: float | NDArray[np.float64], distance: float | NDArray[np.float64]):
+    mu_0 = 4 * pi * 10e-7
+    return (mu_0 + magnitude) / distance**3
+
+
+@dataclass()
+class MagnetArray(Magnet):
+    """Several magnets whose disturbances of the heading are superposed.
+
+    `positions` is an (M, 2) array with the location of each magnet on the ground and `strengths`
+    holds the magnetic moment of each magnet. The offset is the noise of the current step scaled by
+    the sum of the scales of every magnet, so an array with a single magnet of strength 0.8
+    behaves like a `GaussianMagnet`. Distances are clamped to `min_distance` to keep the field
+    finite at the magnets.
+    """
+
+    positions: NDArray[np.float64]
+    strengths: NDArray[np.float64]
+    rng: random.Generator
+    min_distance: float = field(default=0.01)
+    _noise: NoiseStream = field(init=False, repr=False)
+    _step: int = field(default=0, init=False, repr=False)
+
+    def __post_init__(self):
+        self._noise = NoiseStream(self.rng)
+        self.positions = np.asarray(self.positions, dtype=np.float64).reshape(-1, 2)
+        self.strengths = np.asarray(self.strengths, dtype=np.float64).reshape(-1)
+
+        if len(self.positions) != len(self.strengths):
+            raise ValueError("Each magnet must have both a position and a strength")
+
+    def field(self, x: ArrayLike, y: ArrayLike, z: ArrayLike = 0.0) -> NDArray[np.float64]:
+        """Compute the superposed scale of the magnets at each of the given points."""
+
+        x = np.asarray(x, dtype=np.float64)[..., np.newaxis]
+        y = np.asarray(y, dtype=np.float64)[..., np.newaxis]
+        z = np.asarray(z, dtype=np.float64)[..., np.newaxis]
+        dx = x - self.positions[:, 0]
+        dy = y - self.positions[:, 1]
+        d = np.sqrt(dx * dx + dy * dy + z * z)
+
+        return _scale(self.strengths, np.maximum(d, self.min_distance)).sum(axis=-1)
+
+    def seek(self, step: int):
+        self._step = step
+
+    def offset(self, time: float, model: Model) -> float:
+        x, y, z = model.position
+        return self._noise[self._step] * float(self.field(x, y, z))
+
+
+@dataclass()
+class FieldMap(Magnet):
+    """Magnet disturbance using scales precomputed on a regular grid over the arena.
+
+    The scale at the position of the model is bilinearly interpolated from the four surrounding
+    grid points, so the cost of an offset does not depend on the number of magnets. Positions
+    outside of the grid use the nearest point on its boundary.
+    """
+
+    x0: float
+    y0: float
+    resolution: float
+    scales: NDArray[np.float64]
+    rng: random.Generator
+    _noise: NoiseStream = field(init=False, repr=False)
+    _step: int = field(default=0, init=False, repr=False)
+
+    def __post_init__(self):
+        self._noise = NoiseStream(self.rng)
+
+    @classmethod
+    def from_array(
+        cls,
+        magnets: MagnetArray,
+        bounds: tuple[float, float, float, float],
+        resolution: float = 0.05,
+    ) -> FieldMap:
+        """Precompute the field of `magnets` over the area (xmin, ymin, xmax, ymax)."""
+
+        xmin, ymin, xmax, ymax = bounds
+        xs = xmin + resolution * np.arange(floor((xmax - xmin) / resolution) + 2)
+        ys = ymin + resolution * np.arange(floor((ymax - ymin) / resolution) + 2)
+        scales = magnets.field(xs[:, np.newaxis], ys[np.newaxis, :])
+
+        return cls(xmin, ymin, resolution, scales, magnets.rng)
+
+    def scale(self, x: float, y: float) -> float:
+        nx, ny = self.scales.shape
+        u = min(max((x - self.x0) / self.resolution, 0.0), nx - 1.0)
+        v = min(max((y - self.y0) / self.resolution, 0.0), ny - 1.0)
+        i = min(int(u), nx - 2)
+        j = min(int(v), ny - 2)
+        fu = u - i
+        fv = v - j
+        s = self.scales
+
+        return (
+            (1 - fu) * (1 - fv) * s[i, j]
+            + fu * (1 - fv) * s[i + 1, j]
+            + (1 - fu) * fv * s[i, j + 1]
+            + fu * fv * s[i + 1, j + 1]
+        )
+
+    def seek(self, step: int):
+        self._step = step
+
+    def offset(self, time: float, model: Model) -> float:
+        x, y, _ = model.position
+        return self._noise[self._step] * float(self.scale(x, y))
 
 
 class SpeedController:
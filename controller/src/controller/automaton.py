@@ -7,9 +7,13 @@ import logging
 import math
 import typing
 
+import numpy as np
+from numpy.typing import NDArray
+
 Position: typing.TypeAlias = tuple[float, float, float]
 Command: typing.TypeAlias = typing.Literal[55, 66]
 Direction: typing.TypeAlias = typing.Literal[-1, 0, 1]
+Observer: typing.TypeAlias = typing.Callable[[str, float, float], None]
 
 
 @dc.dataclass(frozen=True, slots=True)
@@ -22,6 +26,35 @@ class Flags:
     check_position: bool = dc.field(default=True)
     move: bool = dc.field(default=False)
 
+    @property
+    def mask(self) -> int:
+        """Bitmask representation of the flags."""
+
+        return (
+            (AUTODRIVE if self.autodrive else 0)
+            | (UPDATE_COMPASS if self.update_compass else 0)
+            | (UPDATE_GPS if self.update_gps else 0)
+            | (CHECK_POSITION if self.check_position else 0)
+            | (MOVE if self.move else 0)
+        )
+
+    @classmethod
+    def from_mask(cls, mask: int) -> Flags:
+        return cls(
+            autodrive=bool(mask & AUTODRIVE),
+            update_compass=bool(mask & UPDATE_COMPASS),
+            update_gps=bool(mask & UPDATE_GPS),
+            check_position=bool(mask & CHECK_POSITION),
+            move=bool(mask & MOVE),
+        )
+
+
+AUTODRIVE: typing.Final[int] = 1 << 0
+UPDATE_COMPASS: typing.Final[int] = 1 << 1
+UPDATE_GPS: typing.Final[int] = 1 << 2
+CHECK_POSITION: typing.Final[int] = 1 << 3
+MOVE: typing.Final[int] = 1 << 4
+
 
 class Model(typing.Protocol):
     """Wrapper class to avoid setting rover properties unintentionally in states."""
@@ -47,8 +80,12 @@ class State(abc.ABC):
     flags: Flags
     
     @abc.abstractmethod
-    def next(self, model: Model, cmd: Command | None) -> State:
-        """Advance the system to the next state."""
+    def next(self, model: Model, cmd: Command | None, observe: Observer | None = None) -> State:
+        """Advance the system to the next state.
+
+        If provided, `observe` is called with the name, value and threshold of each guard the
+        state evaluates.
+        """
 
         ...
 
@@ -81,22 +118,25 @@ class S1(State):
         assert not self.flags.update_gps
         assert not self.flags.move
 
-    def next(self, model: Model, cmd: Command | None) -> State:
+    def next(self, model: Model, cmd: Command | None, observe: Observer | None = None) -> State:
+        if observe is not None:
+            observe("time", self.time, 5)
+
         if self.time >= 5:
-            self.LOGGER.info("Wait time exceeded. Transitioning to S2.")
             return S2(
                 flags=dc.replace(self.flags, autodrive=True),
                 initial_position=model.position,
             )
 
-        self.LOGGER.info(f"Current time: {self.time}, Time remaining: {5 - self.time}")
         return S1(self.flags, step_size=self.step_size, time=self.time + self.step_size)
 
 
 def euclidean_distance(p1: Position, p2: Position) -> float:
-    return math.sqrt(
-        math.pow(p2[0] - p1[0], 2) + math.pow(p2[1] - p1[1], 2) + math.pow(p2[2] - p1[2], 2)
-    )
+    dx = p2[0] - p1[0]
+    dy = p2[1] - p1[1]
+    dz = p2[2] - p1[2]
+
+    return math.sqrt(dx * dx + dy * dy + dz * dz)
 
 
 @dc.dataclass(frozen=True, slots=True)
@@ -116,24 +156,23 @@ class S2(State):
     def action(self) -> Action:
         return Action.DRIVE
 
-    def next(self, model: Model, cmd: Command | None) -> State:
+    def next(self, model: Model, cmd: Command | None, observe: Observer | None = None) -> State:
         if cmd == 66:
-            self.LOGGER.info(f"Received command {cmd}, transitioning to S6")
             return S6(flags=dc.replace(self.flags, autodrive=False, check_position=False))
 
         position = model.position
         distance = euclidean_distance(position, self.initial_position)
 
+        if observe is not None:
+            observe("distance", distance, 7)
+
         if distance >= 7:
-            self.LOGGER.info("Distance threshold exceeded. Transitioning to S3.")
             return S3(
                 flags=dc.replace(self.flags, check_position=False, update_compass=True),
                 initial_heading=model.heading,
             )
-        
-        self.LOGGER.info(f"Rover position: <{position[0]:.4f}, {position[1]:.4f}, {position[2]:.4f}>.")
-        self.LOGGER.info(f"Remaining distance: {7 - distance:.4f}")
-        return S2(self.flags, self.initial_position)
+
+        return self
 
 
 @dc.dataclass(frozen=True, slots=True)
@@ -153,9 +192,8 @@ class S3(State):
     def action(self) -> Action:
         return Action.TURN
 
-    def next(self, model: Model, cmd: Command | None) -> State:
+    def next(self, model: Model, cmd: Command | None, observe: Observer | None = None) -> State:
         if cmd == 66:
-            self.LOGGER.info(f"Received command {cmd}. Transitioning to S8")
             return S8(flags=dc.replace(self.flags, autodrive=False, check_position=False))
 
         heading = model.heading
@@ -165,14 +203,13 @@ class S3(State):
         else:
             degrees = self.initial_heading - heading
 
-        self.LOGGER.info(f"Current heading: {heading: 0.4f}. Ground truth heading: {model.heading_real:.4f}")
+        if observe is not None:
+            observe("degrees", degrees, 70)
 
         if degrees >= 70:
-            self.LOGGER.info("Transitioning to S4")
             return S4(flags=dc.replace(self.flags, update_compass=False, update_gps=True))
-        
-        self.LOGGER.info(f"Degrees to target heading: {70 - degrees}")
-        return S3(self.flags, self.initial_heading)
+
+        return self
 
 
 @dc.dataclass(frozen=True, slots=True)
@@ -190,8 +227,7 @@ class S4(State):
     def action(self) -> Action:
         return Action.TURN
     
-    def next(self, model: Model, cmd: Command | None) -> State:
-        self.LOGGER.info("Transitioning to S5")
+    def next(self, model: Model, cmd: Command | None, observe: Observer | None = None) -> State:
         return S5(
             flags=dc.replace(self.flags, update_gps=False, move=True),
             initial_position=model.position,
@@ -215,21 +251,20 @@ class S5(State):
     def action(self) -> Action:
         return Action.DRIVE
     
-    def next(self, model: Model, cmd: Command | None) -> State:
+    def next(self, model: Model, cmd: Command | None, observe: Observer | None = None) -> State:
         if cmd == 66:
-            self.LOGGER.info(f"Received command {cmd}. Transitioning to S7")
             return S7(flags=dc.replace(self.flags, autodrive=False, check_position=False))
 
         position = model.position
         distance = euclidean_distance(self.initial_position, position)
 
+        if observe is not None:
+            observe("distance", distance, 7)
+
         if distance >= 7:
-            self.LOGGER.info("Distance threshold exceeded. Transitioning to S6.")
             return S6(flags=dc.replace(self.flags, autodrive=False, move=False))
 
-        self.LOGGER.info(f"Rover position: <{position[0]:.4f}, {position[1]:.4f}, {position[2]:.4f}>.")
-        self.LOGGER.info(f"Remaining distance: {7 - distance:.4f}")
-        return S5(self.flags, self.initial_position)
+        return self
 
 
 @dc.dataclass(frozen=True, slots=True)
@@ -244,8 +279,8 @@ class S6(State):
     def is_terminal(self) -> bool:
         return True
 
-    def next(self, model: Model, cmd: Command | None) -> State:
-         return S6(self.flags)
+    def next(self, model: Model, cmd: Command | None, observe: Observer | None = None) -> State:
+        return self
 
 
 @dc.dataclass(frozen=True, slots=True)
@@ -263,12 +298,10 @@ class S7(State):
     def action(self) -> Action:
         return Action.DRIVE
 
-    def next(self, model: Model, cmd: Command | None) -> State:
+    def next(self, model: Model, cmd: Command | None, observe: Observer | None = None) -> State:
         if cmd == 55:
-            self.LOGGER.info(f"Command receieved: {cmd}. Transitioning to S9")
             return S9(self.flags)
-        
-        self.LOGGER.info("Transitioning to S6")
+
         return S6(flags=dc.replace(self.flags, move=False))
 
 
@@ -287,8 +320,7 @@ class S8(State):
     def action(self) -> Action:
         return Action.TURN
 
-    def next(self, model: Model, cmd: Command | None) -> State:
-        self.LOGGER.info("Transitioning to S7")
+    def next(self, model: Model, cmd: Command | None, observe: Observer | None = None) -> State:
         return S7(flags=dc.replace(self.flags, move=True, update_compass=False))
 
 
@@ -304,20 +336,484 @@ class S9(State):
     def is_terminal(self) -> bool:
         return True
 
-    def next(self, model: Model, cmd: Command | None) -> State:
-        return S9(self.flags)
+    def next(self, model: Model, cmd: Command | None, observe: Observer | None = None) -> State:
+        return self
+
+
+@dc.dataclass(frozen=True, slots=True)
+class Guard:
+    """The value of a transition guard evaluated by a state during a step."""
+
+    tick: int
+    state: State
+    name: str
+    value: float
+    threshold: float
+
+
+_COMMANDED: typing.Final[dict[tuple[type[State], Command], type[State]]] = {
+    (S2, 66): S6,
+    (S3, 66): S8,
+    (S5, 66): S7,
+    (S7, 55): S9,
+}
+"""Target of the transition caused by each command accepted by a state."""
+
+
+@dc.dataclass(frozen=True, slots=True)
+class Transition:
+    """A change of state caused by a step."""
+
+    tick: int
+    source: State
+    target: State
+    cmd: Command | None
+
+    @property
+    def commanded(self) -> bool:
+        """Whether the transition was caused by the command instead of a guard."""
+
+        if self.cmd is None:
+            return False
+
+        return _COMMANDED.get((type(self.source), self.cmd)) is type(self.target)
+
+
+Event: typing.TypeAlias = typing.Union[Guard, Transition]
+Subscriber: typing.TypeAlias = typing.Callable[[Event], None]
+
+
+class LogSubscriber:
+    """Subscriber that writes events to the logger of the state that produced them."""
+
+    def __init__(self, model: Model | None = None):
+        self.model = model
+
+    def __call__(self, event: Event):
+        if isinstance(event, Transition):
+            source = type(event.source)
+            target = type(event.target).__name__
+
+            if event.commanded:
+                source.LOGGER.info(f"Received command {event.cmd}. Transitioning to {target}")
+            else:
+                source.LOGGER.info(f"Transitioning to {target}")
+        else:
+            logger = type(event.state).LOGGER
+
+            if event.name == "degrees" and self.model is not None:
+                logger.info(f"Ground truth heading: {self.model.heading_real:.4f}")  # type: ignore[attr-defined]
+
+            logger.info(f"Current {event.name}: {event.value:.4f}, remaining: {event.threshold - event.value:.4f}")
+
 
+class _Observable:
+    """Event publishing shared by the automaton implementations.
 
-class Automaton:
+    Guard values and transitions are only packaged into events when there is at least one
+    subscriber. The number of steps spent in each state is always counted in `dwell`.
+    """
+
+    def __init__(self):
+        self.tick = 0
+        self._dwell = [0] * (len(STATES) + 1)
+        self._subscribers: list[Subscriber] = []
+
+    @property
+    def dwell(self) -> dict[type[State], int]:
+        """The number of steps taken from each state."""
+
+        return {cls: self._dwell[code] for code, cls in enumerate(STATES, start=1)}
+
+    def subscribe(self, subscriber: Subscriber) -> typing.Callable[[], None]:
+        """Register a subscriber, returning a function that removes it."""
+
+        self._subscribers.append(subscriber)
+        return lambda: self._subscribers.remove(subscriber)
+
+    def _publish(self, event: Event):
+        for subscriber in self._subscribers:
+            subscriber(event)
+
+
+class Automaton(_Observable):
     def __init__(self, model: Model, step_size: float):
+        super().__init__()
         self.model = model
         self.state: State = S1(flags=Flags(), time=0.0, step_size=step_size)
         self.history: list[State] = []
 
-    def step(self, cmd: Command | None):
-        self.history.append(self.state)
-        self.state = self.state.next(self.model, cmd)
+    def step(self, cmd: Command | None, model: Model | None = None):
+        """Advance the automaton, observing `model` instead of the automaton model if provided."""
+
+        state = self.state
+        tick = self.tick
+        model = self.model if model is None else model
+        self.history.append(state)
+        self._dwell[_CODES[type(state)]] += 1
+        self.tick = tick + 1
+
+        if not self._subscribers:
+            self.state = state.next(model, cmd)
+            return
+
+        def observe(name: str, value: float, threshold: float):
+            self._publish(Guard(tick, state, name, value, threshold))
+
+        self.state = state.next(model, cmd, observe)
+
+        if type(self.state) is not type(state):
+            self._publish(Transition(tick, state, self.state, cmd))
 
     @property
     def action(self) -> Action:
         return self.state.action
+
+
+STATES: typing.Final[tuple[type[State], ...]] = (S1, S2, S3, S4, S5, S6, S7, S8, S9)
+"""State classes ordered by state code, the code of a state is its index in this tuple plus one."""
+
+VALID_FLAGS: typing.Final[dict[type[State], int]] = {
+    S1: CHECK_POSITION,
+    S2: CHECK_POSITION | AUTODRIVE,
+    S3: AUTODRIVE | UPDATE_COMPASS,
+    S4: AUTODRIVE | UPDATE_GPS,
+    S5: AUTODRIVE | MOVE,
+    S6: 0,
+    S7: MOVE,
+    S8: UPDATE_COMPASS,
+    S9: 0,
+}
+"""The only flag combination each state accepts in its __post_init__ checks."""
+
+
+_CODES: typing.Final[dict[type[State], int]] = {cls: code for code, cls in enumerate(STATES, start=1)}
+
+
+def state_code(state: State) -> int:
+    return _CODES[type(state)]
+
+
+_FLAGS_TABLE = np.array([0] + [VALID_FLAGS[cls] for cls in STATES], dtype=np.uint8)
+_ACTION_TABLE = np.array(
+    [Action.STOP, Action.STOP, Action.DRIVE, Action.TURN, Action.TURN, Action.DRIVE, Action.STOP, Action.DRIVE, Action.TURN, Action.STOP],
+    dtype=np.uint8,
+)
+
+
+def _without(bits: int) -> int:
+    return 0xFF & ~bits
+
+
+class BatchAutomaton:
+    """Many independent automata advanced in lockstep using array operations.
+
+    Each controller is stored as one row of a set of arrays instead of a `State` instance. Commands
+    are given as an integer array where 0 represents the absence of a command.
+    """
+
+    def __init__(self, n: int, step_size: float):
+        self.step_size = step_size
+        self.codes: NDArray[np.uint8] = np.ones(n, dtype=np.uint8)
+        self.flags: NDArray[np.uint8] = np.full(n, Flags().mask, dtype=np.uint8)
+        self.times: NDArray[np.float64] = np.zeros(n, dtype=np.float64)
+        self.initial_positions: NDArray[np.float64] = np.zeros((n, 3), dtype=np.float64)
+        self.initial_headings: NDArray[np.float64] = np.zeros(n, dtype=np.float64)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def step(
+        self,
+        positions: NDArray[np.float64],
+        headings: NDArray[np.float64],
+        cmds: NDArray[np.integer] | None = None,
+    ):
+        """Advance every automaton using the positions and headings observed in this step."""
+
+        codes = self.codes
+        flags = self.flags
+        cmd = np.zeros(len(codes), dtype=np.uint8) if cmds is None else cmds
+        abort = cmd == 66
+
+        # Guards are evaluated against the codes from the beginning of the step so that a
+        # transition cannot trigger a second transition in the same step.
+        s1 = codes == 1
+        s2 = codes == 2
+        s3 = codes == 3
+        s4 = codes == 4
+        s5 = codes == 5
+        s7 = codes == 7
+        s8 = codes == 8
+
+        s1_exit = s1 & (self.times >= 5)
+        s1_stay = s1 & ~s1_exit
+
+        s2_abort = s2 & abort
+        delta = self.initial_positions - positions
+        distance = np.sqrt(delta[:, 0] * delta[:, 0] + delta[:, 1] * delta[:, 1] + delta[:, 2] * delta[:, 2])
+        s2_exit = s2 & ~abort & (distance >= 7)
+
+        s3_abort = s3 & abort
+        degrees = np.where(
+            headings > self.initial_headings,
+            self.initial_headings + (360 - headings),
+            self.initial_headings - headings,
+        )
+        s3_exit = s3 & ~abort & (degrees >= 70)
+
+        s5_abort = s5 & abort
+        s5_exit = s5 & ~abort & (distance >= 7)
+
+        s7_resume = s7 & (cmd == 55)
+        s7_exit = s7 & ~s7_resume
+
+        self.times[s1_stay] += self.step_size
+
+        codes[s1_exit] = 2
+        flags[s1_exit] |= AUTODRIVE
+        self.initial_positions[s1_exit] = positions[s1_exit]
+
+        codes[s2_abort] = 6
+        flags[s2_abort] &= _without(AUTODRIVE | CHECK_POSITION)
+
+        codes[s2_exit] = 3
+        flags[s2_exit] &= _without(CHECK_POSITION)
+        flags[s2_exit] |= UPDATE_COMPASS
+        self.initial_headings[s2_exit] = headings[s2_exit]
+
+        codes[s3_abort] = 8
+        flags[s3_abort] &= _without(AUTODRIVE | CHECK_POSITION)
+
+        codes[s3_exit] = 4
+        flags[s3_exit] &= _without(UPDATE_COMPASS)
+        flags[s3_exit] |= UPDATE_GPS
+
+        codes[s4] = 5
+        flags[s4] &= _without(UPDATE_GPS)
+        flags[s4] |= MOVE
+        self.initial_positions[s4] = positions[s4]
+
+        codes[s5_abort] = 7
+        flags[s5_abort] &= _without(AUTODRIVE | CHECK_POSITION)
+
+        codes[s5_exit] = 6
+        flags[s5_exit] &= _without(AUTODRIVE | MOVE)
+
+        codes[s7_resume] = 9
+
+        codes[s7_exit] = 6
+        flags[s7_exit] &= _without(MOVE)
+
+        codes[s8] = 7
+        flags[s8] &= _without(UPDATE_COMPASS)
+        flags[s8] |= MOVE
+
+        invalid = _FLAGS_TABLE[codes] != flags
+
+        if invalid.any():
+            index = int(np.argmax(invalid))
+            raise AssertionError(f"Invalid flags {Flags.from_mask(int(flags[index]))} for state S{codes[index]}")
+
+    @property
+    def actions(self) -> NDArray[np.uint8]:
+        return _ACTION_TABLE[self.codes]
+
+    @property
+    def terminal(self) -> NDArray[np.bool_]:
+        return (self.codes == 6) | (self.codes == 9)
+
+    def state(self, index: int) -> State:
+        """Create the scalar state of the automaton at `index`."""
+
+        code = int(self.codes[index])
+        flags = Flags.from_mask(int(self.flags[index]))
+
+        if code == 1:
+            return S1(flags, time=float(self.times[index]), step_size=self.step_size)
+
+        if code == 2 or code == 5:
+            x, y, z = self.initial_positions[index].tolist()
+            return STATES[code - 1](flags, (x, y, z))  # type: ignore[call-arg]
+
+        if code == 3:
+            return S3(flags, float(self.initial_headings[index]))
+
+        return STATES[code - 1](flags)  # type: ignore[call-arg]
+
+
+_MASKS: typing.Final[tuple[int, ...]] = tuple(_FLAGS_TABLE.tolist())
+_FLAGS: typing.Final[tuple[Flags, ...]] = tuple(Flags.from_mask(mask) for mask in _MASKS)
+_ACTIONS: typing.Final[tuple[Action, ...]] = tuple(Action(action) for action in _ACTION_TABLE.tolist())
+
+
+class CompiledAutomaton(_Observable):
+    """Table-driven equivalent of `Automaton`.
+
+    The current state is kept as a state code, a flag bitmask and the parameters of the state
+    instead of a `State` instance. Transitions are dispatched from a table indexed by state code and
+    the flags are only checked when a transition occurs. `State` instances are only created when the
+    state is read, states without parameters are interned and states that do not change between
+    steps are reused, so the history contains the same states as the history of an `Automaton`.
+    Subscribers receive the same events as the subscribers of an `Automaton`.
+    """
+
+    _INTERNED: typing.ClassVar[dict[int, State]] = {
+        code: STATES[code - 1](_FLAGS[code])  # type: ignore[call-arg]
+        for code in (4, 6, 7, 8, 9)
+    }
+
+    def __init__(self, model: Model, step_size: float):
+        super().__init__()
+        self.model = model
+        self.step_size = step_size
+        self.history: list[State] = []
+        self._code = 1
+        self._flags = CHECK_POSITION
+        self._time = 0.0
+        self._initial_position: Position = (0.0, 0.0, 0.0)
+        self._initial_heading = 0.0
+        self._state: State | None = None
+        self._table: tuple[typing.Callable[[Model, Command | None], None], ...] = (
+            self._terminal,
+            self._s1,
+            self._s2,
+            self._s3,
+            self._s4,
+            self._s5,
+            self._terminal,
+            self._s7,
+            self._s8,
+            self._terminal,
+        )
+
+    @property
+    def state(self) -> State:
+        if self._state is None:
+            self._state = self._materialize()
+
+        return self._state
+
+    @property
+    def action(self) -> Action:
+        return _ACTIONS[self._code]
+
+    def step(self, cmd: Command | None, model: Model | None = None):
+        code = self._code
+        state = self._state
+
+        if state is None:
+            state = self._state = self._materialize()
+
+        self.history.append(state)
+        self._dwell[code] += 1
+        self._table[code](self.model if model is None else model, cmd)
+        self.tick += 1
+
+        if self._subscribers and self._code != code:
+            self._publish(Transition(self.tick - 1, state, self.state, cmd))
+
+    def _observe(self, name: str, value: float, threshold: float):
+        self._publish(Guard(self.tick, self.history[-1], name, value, threshold))
+
+    def _materialize(self) -> State:
+        code = self._code
+
+        if code == 1:
+            return S1(_FLAGS[1], time=self._time, step_size=self.step_size)
+
+        if code == 2:
+            return S2(_FLAGS[2], self._initial_position)
+
+        if code == 3:
+            return S3(_FLAGS[3], self._initial_heading)
+
+        if code == 5:
+            return S5(_FLAGS[5], self._initial_position)
+
+        return self._INTERNED[code]
+
+    def _enter(self, code: int, flags: int):
+        if flags != _MASKS[code]:
+            raise AssertionError(f"Invalid flags {Flags.from_mask(flags)} for state S{code}")
+
+        self._code = code
+        self._flags = flags
+        self._state = None
+
+    def _terminal(self, model: Model, cmd: Command | None):
+        pass
+
+    def _s1(self, model: Model, cmd: Command | None):
+        if self._subscribers:
+            self._observe("time", self._time, 5)
+
+        if self._time >= 5:
+            self._initial_position = model.position
+            self._enter(2, self._flags | AUTODRIVE)
+        else:
+            self._time = self._time + self.step_size
+            self._state = None
+
+    def _s2(self, model: Model, cmd: Command | None):
+        if cmd == 66:
+            self._enter(6, self._flags & _without(AUTODRIVE | CHECK_POSITION))
+            return
+
+        x, y, z = model.position
+        x0, y0, z0 = self._initial_position
+        distance = math.sqrt((x0 - x) * (x0 - x) + (y0 - y) * (y0 - y) + (z0 - z) * (z0 - z))
+
+        if self._subscribers:
+            self._observe("distance", distance, 7)
+
+        if distance >= 7:
+            self._initial_heading = model.heading
+            self._enter(3, (self._flags & _without(CHECK_POSITION)) | UPDATE_COMPASS)
+
+    def _s3(self, model: Model, cmd: Command | None):
+        if cmd == 66:
+            self._enter(8, self._flags & _without(AUTODRIVE | CHECK_POSITION))
+            return
+
+        heading = model.heading
+        initial_heading = self._initial_heading
+
+        if heading > initial_heading:
+            degrees = initial_heading + (360 - heading)
+        else:
+            degrees = initial_heading - heading
+
+        if self._subscribers:
+            self._observe("degrees", degrees, 70)
+
+        if degrees >= 70:
+            self._enter(4, (self._flags & _without(UPDATE_COMPASS)) | UPDATE_GPS)
+
+    def _s4(self, model: Model, cmd: Command | None):
+        self._initial_position = model.position
+        self._enter(5, (self._flags & _without(UPDATE_GPS)) | MOVE)
+
+    def _s5(self, model: Model, cmd: Command | None):
+        if cmd == 66:
+            self._enter(7, self._flags & _without(AUTODRIVE | CHECK_POSITION))
+            return
+
+        x, y, z = model.position
+        x0, y0, z0 = self._initial_position
+        distance = math.sqrt((x - x0) * (x - x0) + (y - y0) * (y - y0) + (z - z0) * (z - z0))
+
+        if self._subscribers:
+            self._observe("distance", distance, 7)
+
+        if distance >= 7:
+            self._enter(6, self._flags & _without(AUTODRIVE | MOVE))
+
+    def _s7(self, model: Model, cmd: Command | None):
+        if cmd == 55:
+            self._enter(9, self._flags)
+        else:
+            self._enter(6, self._flags & _without(MOVE))
+
+    def _s8(self, model: Model, cmd: Command | None):
+        self._enter(7, (self._flags & _without(UPDATE_COMPASS)) | MOVE)
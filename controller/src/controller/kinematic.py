@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from logging import Logger, NullHandler, getLogger
+from math import atan2, cos, degrees, sin, tan
+
+import numpy as np
+from numpy.typing import NDArray
+
+from .attacks import Magnet
+from .automaton import Model, Position
+from .sensors import Snapshot
+
+WHEEL_RADIUS: float = 0.06
+"""Radius of the ngc_rover wheels in meters."""
+
+WHEEL_BASE: float = 0.312
+"""Distance between the front and rear axles of the ngc_rover in meters."""
+
+STEERING_LIMIT: float = 0.5236
+"""Joint limit of the ngc_rover steering servos in radians."""
+
+
+def _kinematic_logger() -> Logger:
+    logger = getLogger("kinematic")
+    logger.addHandler(NullHandler())
+
+    return logger
+
+
+def compass(yaw: float) -> float:
+    """Convert a yaw angle in radians (counter-clockwise from +x) into a compass heading in degrees.
+
+    The heading decreases as the rover turns left, which matches the heading computed from the
+    magnetometer of the Gazebo model.
+    """
+
+    return (90.0 - degrees(yaw)) % 360.0
+
+
+def advance(
+    x: float,
+    y: float,
+    yaw: float,
+    speed: float,
+    steering_angle: float,
+    dt: float,
+) -> tuple[float, float, float]:
+    """Integrate the bicycle model exactly over an interval with constant inputs."""
+
+    omega = speed * tan(steering_angle) / WHEEL_BASE
+
+    if omega == 0.0:
+        return x + speed * cos(yaw) * dt, y + speed * sin(yaw) * dt, yaw
+
+    yaw_ = yaw + omega * dt
+    radius = speed / omega
+    x_ = x + radius * (sin(yaw_) - sin(yaw))
+    y_ = y - radius * (cos(yaw_) - cos(yaw))
+
+    return x_, y_, atan2(sin(yaw_), cos(yaw_))
+
+
+@dataclass()
+class Ackermann(Model):
+    """Headless kinematic replacement for the Gazebo ngc_rover.
+
+    The vehicle only moves when `step` is called, so simulated time advances as quickly as the
+    caller is able to step it. Velocity commands are interpreted as wheel angular velocities, the
+    same as the motor speed commands sent to the Gazebo model.
+    """
+
+    _magnet: Magnet = field()
+    _x: float = field(default=0.0)
+    _y: float = field(default=0.0)
+    _yaw: float = field(default=0.0)
+    _clock: float = field(default=0.0, init=False)
+    _velocity: float = field(default=0.0, init=False)
+    _steering_angle: float = field(default=0.0, init=False)
+    _logger: Logger = field(default_factory=_kinematic_logger, init=False)
+
+    @property
+    def clock(self) -> float:
+        return self._clock
+
+    @property
+    def position(self) -> Position:
+        return (self._x, self._y, 0.0)
+
+    @property
+    def heading_real(self) -> float:
+        return compass(self._yaw)
+
+    @property
+    def heading(self) -> float:
+        return self.heading_real + self._magnet.offset(self.clock, self)
+
+    @property
+    def roll(self) -> float:
+        return 0.0
+
+    @property
+    def steering_angle(self) -> float:
+        return self._steering_angle
+
+    @steering_angle.setter
+    def steering_angle(self, target: float):
+        if not -0.5 <= target <= 0.5:
+            raise ValueError("Steering angle must be within interval [-0.5, 0.5]")
+
+        if target != self._steering_angle:
+            self._steering_angle = target
+            self._logger.debug(f"Setting steering angle to {target}")
+
+    @property
+    def velocity(self) -> float:
+        return self._velocity
+
+    @velocity.setter
+    def velocity(self, target: float):
+        if target != self._velocity:
+            self._velocity = target
+            self._logger.debug(f"Setting velocity to {target}")
+
+    def snapshot(self, clock: float | None = None) -> Snapshot:
+        # The model is only ever observed at its current time, so `clock` is ignored
+        heading = self.heading_real
+        return Snapshot(self._clock, self.position, heading + self._magnet.offset(self._clock, self), heading, 0.0)
+
+    def step(self, dt: float):
+        """Advance the simulated time of the vehicle by `dt` seconds."""
+
+        steering_angle = max(-STEERING_LIMIT, min(STEERING_LIMIT, self._steering_angle))
+        speed = self._velocity * WHEEL_RADIUS
+        self._x, self._y, self._yaw = advance(self._x, self._y, self._yaw, speed, steering_angle, dt)
+        self._clock += dt
+
+    def wait(self):
+        pass
+
+    def flush(self):
+        pass
+
+
+class Fleet:
+    """Vectorized kinematic model of many independent rovers.
+
+    Intended to be paired with `automaton.BatchAutomaton`. Magnet offsets are not applied, callers
+    should add them to the headings returned by `headings`.
+    """
+
+    def __init__(self, n: int):
+        self.clock = 0.0
+        self.x: NDArray[np.float64] = np.zeros(n, dtype=np.float64)
+        self.y: NDArray[np.float64] = np.zeros(n, dtype=np.float64)
+        self.yaw: NDArray[np.float64] = np.zeros(n, dtype=np.float64)
+        self.velocity: NDArray[np.float64] = np.zeros(n, dtype=np.float64)
+        self.steering_angle: NDArray[np.float64] = np.zeros(n, dtype=np.float64)
+
+    @property
+    def positions(self) -> NDArray[np.float64]:
+        return np.stack([self.x, self.y, np.zeros_like(self.x)], axis=1)
+
+    @property
+    def headings(self) -> NDArray[np.float64]:
+        return (90.0 - np.degrees(self.yaw)) % 360.0
+
+    def step(self, dt: float):
+        speed = self.velocity * WHEEL_RADIUS
+        steering_angle = np.clip(self.steering_angle, -STEERING_LIMIT, STEERING_LIMIT)
+        omega = speed * np.tan(steering_angle) / WHEEL_BASE
+        turning = omega != 0.0
+        yaw = self.yaw + omega * dt
+        radius = np.divide(speed, omega, out=np.zeros_like(speed), where=turning)
+
+        self.x = np.where(turning, self.x + radius * (np.sin(yaw) - np.sin(self.yaw)), self.x + speed * np.cos(self.yaw) * dt)
+        self.y = np.where(turning, self.y - radius * (np.cos(yaw) - np.cos(self.yaw)), self.y + speed * np.sin(self.yaw) * dt)
+        self.yaw = np.arctan2(np.sin(yaw), np.cos(yaw))
+        self.clock += dt
+
+
+def ackermann(*, magnet: Magnet) -> Ackermann:
+    logger = getLogger("kinematic.ackermann")
+    logger.addHandler(NullHandler())
+    logger.info("Created headless kinematic rover model.")
+
+    return Ackermann(magnet)
@@ -1,9 +1,15 @@
 from __future__ import annotations
 
-from collections.abc import Iterable, Iterator
+import struct
+from collections.abc import Iterable, Iterator, Sequence
 from dataclasses import dataclass, field
+from typing import Literal
+
+import numpy as np
+from numpy.typing import NDArray
 
 from controller import attacks, automaton
+from controller.telemetry import Telemetry
 
 
 @dataclass()
@@ -15,12 +21,231 @@ class Step:
     state: automaton.State = field()
 
 
+RESULT_MAGIC: bytes = b"NGCR"
+RESULT_VERSION: int = 3
+
+_HEADERS = {
+    1: struct.Struct("<4sBBII"),
+    2: struct.Struct("<4sBBIId"),
+    3: struct.Struct("<4sBBIId"),
+}
+_CANCELLED = 1 << 0
+_ROBUSTNESS = 1 << 1
+_TELEMETRY = 1 << 2
+
+
+def _parameters(state: automaton.State) -> tuple[float, float, float]:
+    if isinstance(state, automaton.S1):
+        return (state.time, state.step_size, 0.0)
+
+    if isinstance(state, (automaton.S2, automaton.S5)):
+        return state.initial_position
+
+    if isinstance(state, automaton.S3):
+        return (state.initial_heading, 0.0, 0.0)
+
+    return (0.0, 0.0, 0.0)
+
+
+def _state(code: int, parameters: tuple[float, float, float]) -> automaton.State:
+    cls = automaton.STATES[code - 1]
+    flags = automaton.Flags.from_mask(automaton.VALID_FLAGS[cls])
+
+    if code == 1:
+        return automaton.S1(flags, time=parameters[0], step_size=parameters[1])
+
+    if code == 2 or code == 5:
+        return cls(flags, parameters)  # type: ignore[call-arg]
+
+    if code == 3:
+        return automaton.S3(flags, parameters[0])
+
+    return cls(flags)  # type: ignore[call-arg]
+
+
+def _next_wait(state: automaton.S1) -> automaton.S1:
+    return automaton.S1(state.flags, time=state.time + state.step_size, step_size=state.step_size)
+
+
+def _continues(previous: automaton.State, state: automaton.State) -> bool:
+    # Waiting in S1 only changes the time of the state, which can be recomputed by adding the step
+    # size to the time of the first S1 state.
+    if isinstance(previous, automaton.S1) and isinstance(state, automaton.S1):
+        return state == _next_wait(previous)
+
+    return state == previous
+
+
 @dataclass()
 class Result(Iterable[Step]):
-    history: list[Step] = field()
+    """Trajectory of a simulation stored as columns.
+
+    Every step is one row of the `time`, `position`, `heading`, `roll` and `state` columns, where
+    `state` holds the state code of the automaton. Since each state only allows a single
+    combination of flags, the flags are not stored. The parameters of the states are stored in a
+    side table with one entry per run of equal (or, for S1, consecutive) states, made of the row
+    where the run begins in `state_rows` and the parameters of the state in `state_parameters`.
+
+    Iterating over a result creates each `Step` as it is needed. Results are pickled using the
+    binary encoding from `encode`.
+
+    If the run was monitored, `robustness` is the robustness of the specification over the run,
+    and if the timing of its control loop was recorded it is kept in `telemetry`.
+    """
+
+    time: NDArray[np.float64] = field()
+    position: NDArray[np.float64] = field()
+    heading: NDArray[np.float64] = field()
+    roll: NDArray[np.float64] = field()
+    state: NDArray[np.uint8] = field()
+    state_rows: NDArray[np.uint32] = field()
+    state_parameters: NDArray[np.float64] = field()
+    cancelled: bool = field(default=False)
+    robustness: float | None = field(default=None)
+    telemetry: Telemetry | None = field(default=None)
+
+    @classmethod
+    def from_steps(
+        cls,
+        steps: Sequence[Step],
+        *,
+        cancelled: bool = False,
+        robustness: float | None = None,
+        telemetry: Telemetry | None = None,
+    ) -> Result:
+        rows: list[int] = []
+        parameters: list[tuple[float, float, float]] = []
+        previous: automaton.State | None = None
+
+        for row, step in enumerate(steps):
+            if previous is None or not _continues(previous, step.state):
+                rows.append(row)
+                parameters.append(_parameters(step.state))
+
+            previous = step.state
+
+        return cls(
+            time=np.array([step.time for step in steps], dtype=np.float64),
+            position=np.array([step.position for step in steps], dtype=np.float64).reshape(-1, 3),
+            heading=np.array([step.heading for step in steps], dtype=np.float64),
+            roll=np.array([step.roll for step in steps], dtype=np.float64),
+            state=np.array([automaton.state_code(step.state) for step in steps], dtype=np.uint8),
+            state_rows=np.array(rows, dtype=np.uint32),
+            state_parameters=np.array(parameters, dtype=np.float64).reshape(-1, 3),
+            cancelled=cancelled,
+            robustness=robustness,
+            telemetry=telemetry,
+        )
+
+    def __len__(self) -> int:
+        return len(self.time)
 
     def __iter__(self) -> Iterator[Step]:
-        return iter(self.history)
+        times = self.time.tolist()
+        positions = self.position.tolist()
+        headings = self.heading.tolist()
+        rolls = self.roll.tolist()
+        codes = self.state.tolist()
+        starts = dict(zip(self.state_rows.tolist(), self.state_parameters.tolist()))
+        state: automaton.State | None = None
+
+        for row, time in enumerate(times):
+            if row in starts:
+                state = _state(codes[row], tuple(starts[row]))  # type: ignore[arg-type]
+            elif isinstance(state, automaton.S1):
+                state = _next_wait(state)
+
+            x, y, z = positions[row]
+            yield Step(time, (x, y, z), headings[row], rolls[row], state)  # type: ignore[arg-type]
+
+    def __getitem__(self, index: int) -> Step:
+        row = range(len(self))[index]
+        entry = int(np.searchsorted(self.state_rows, row, side="right")) - 1
+        start = int(self.state_rows[entry])
+        state = _state(int(self.state[start]), tuple(self.state_parameters[entry].tolist()))  # type: ignore[arg-type]
+
+        if isinstance(state, automaton.S1):
+            for _ in range(row - start):
+                state = _next_wait(state)
+
+        x, y, z = self.position[row].tolist()
+        return Step(float(self.time[row]), (x, y, z), float(self.heading[row]), float(self.roll[row]), state)
+
+    @property
+    def history(self) -> list[Step]:
+        return list(self)
+
+    def encode(self) -> bytes:
+        """Encode the result into the versioned binary format read by `decode`."""
+
+        flags = (
+            (_CANCELLED if self.cancelled else 0)
+            | (_ROBUSTNESS if self.robustness is not None else 0)
+            | (_TELEMETRY if self.telemetry is not None else 0)
+        )
+        header = _HEADERS[RESULT_VERSION].pack(
+            RESULT_MAGIC,
+            RESULT_VERSION,
+            flags,
+            len(self.time),
+            len(self.state_rows),
+            self.robustness if self.robustness is not None else 0.0,
+        )
+
+        return b"".join(
+            [
+                header,
+                self.time.astype("<f8").tobytes(),
+                self.position.astype("<f8").tobytes(),
+                self.heading.astype("<f8").tobytes(),
+                self.roll.astype("<f8").tobytes(),
+                self.state.astype("u1").tobytes(),
+                self.state_rows.astype("<u4").tobytes(),
+                self.state_parameters.astype("<f8").tobytes(),
+                self.telemetry.encode() if self.telemetry is not None else b"",
+            ]
+        )
+
+    @classmethod
+    def decode(cls, data: bytes) -> Result:
+        magic, version = struct.unpack_from("<4sB", data)
+
+        if magic != RESULT_MAGIC:
+            raise ValueError("Data is not an encoded result")
+
+        if version not in _HEADERS:
+            raise ValueError(f"Unsupported result encoding version {version}")
+
+        header = _HEADERS[version]
+        _, _, flags, rows, entries, *rest = header.unpack_from(data)
+        robustness = rest[0] if flags & _ROBUSTNESS else None
+        offset = header.size
+
+        def column(dtype: str, count: int) -> NDArray:
+            nonlocal offset
+            array = np.frombuffer(data, dtype=dtype, count=count, offset=offset)
+            offset += array.nbytes
+            return array
+
+        result = cls(
+            time=column("<f8", rows),
+            position=column("<f8", rows * 3).reshape(rows, 3),
+            heading=column("<f8", rows),
+            roll=column("<f8", rows),
+            state=column("u1", rows),
+            state_rows=column("<u4", entries),
+            state_parameters=column("<f8", entries * 3).reshape(entries, 3),
+            cancelled=bool(flags & _CANCELLED),
+            robustness=robustness,
+        )
+
+        if flags & _TELEMETRY:
+            result.telemetry = Telemetry.decode(data, offset)
+
+        return result
+
+    def __reduce__(self):
+        return (Result.decode, (self.encode(),))
 
 
 @dataclass()
@@ -30,3 +255,48 @@ class Start:
     magnet: attacks.Magnet | None = field()
     speed: attacks.SpeedController | None = field()
     commands: Iterable[automaton.Command | None] = field()
+    backend: Literal["gazebo", "kinematic"] = field(default="gazebo")
+    mode: Literal["realtime", "lockstep", "event"] = field(default="realtime")
+    spec: str | None = field(default=None)
+    stop_on_violation: bool = field(default=False)
+
+
+@dataclass()
+class Batch:
+    """Request to run several simulations in the same world on a shared control tick."""
+
+    starts: list[Start] = field()
+
+
+@dataclass()
+class BatchResult:
+    """The results of a `Batch`, in the order of its starts."""
+
+    results: list[Result] = field()
+
+
+@dataclass()
+class Stream:
+    """Request to run a simulation while streaming its steps back in batches of `batch` steps."""
+
+    start: Start = field()
+    batch: int = field(default=10)
+
+
+@dataclass()
+class Progress:
+    """A batch of steps sent to the client during a streamed simulation."""
+
+    steps: list[Step] = field()
+
+
+@dataclass()
+class Cancel:
+    """Sent by the client of a streamed simulation to stop the simulation early."""
+
+
+@dataclass()
+class Failure:
+    """Sent instead of a `Result` when a streamed simulation raises an error."""
+
+    reason: str = field()
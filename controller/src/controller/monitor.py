@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import math
+import re
+import typing
+from dataclasses import dataclass, field
+
+if typing.TYPE_CHECKING:
+    from .messages import Step
+
+Signal: typing.TypeAlias = typing.Callable[["Step"], float]
+Robustness: typing.TypeAlias = typing.Callable[["Step"], float]
+
+SIGNALS: typing.Final[dict[str, Signal]] = {
+    "time": lambda step: step.time,
+    "x": lambda step: step.position[0],
+    "y": lambda step: step.position[1],
+    "z": lambda step: step.position[2],
+    "heading": lambda step: step.heading,
+    "roll": lambda step: step.roll,
+}
+"""Signals of a `Step` that can be used in a specification."""
+
+_TOKEN = re.compile(r"\s*(?:(>=|<=|>|<|\(|\))|([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)|([A-Za-z_]\w*))")
+
+
+class SpecificationError(ValueError):
+    pass
+
+
+def _tokenize(spec: str) -> list[str]:
+    tokens: list[str] = []
+    position = 0
+    spec = spec.rstrip()
+
+    while position < len(spec):
+        match = _TOKEN.match(spec, position)
+
+        if match is None:
+            raise SpecificationError(f"Unexpected character {spec[position]!r} at position {position}")
+
+        tokens.append(match.group(match.lastindex or 0))
+        position = match.end()
+
+    return tokens
+
+
+def _operand(token: str) -> Signal | float:
+    if token in SIGNALS:
+        return SIGNALS[token]
+
+    try:
+        return float(token)
+    except ValueError:
+        raise SpecificationError(f"Unknown signal {token!r}") from None
+
+
+@dataclass()
+class _Parser:
+    tokens: list[str] = field()
+    index: int = field(default=0)
+
+    def peek(self) -> str | None:
+        return self.tokens[self.index] if self.index < len(self.tokens) else None
+
+    def take(self, expected: str | None = None) -> str:
+        token = self.peek()
+
+        if token is None:
+            raise SpecificationError("Unexpected end of specification")
+
+        if expected is not None and token != expected:
+            raise SpecificationError(f"Expected {expected!r} but found {token!r}")
+
+        self.index += 1
+        return token
+
+    def disjunction(self) -> Robustness:
+        operands = [self.conjunction()]
+
+        while self.peek() == "or":
+            self.take()
+            operands.append(self.conjunction())
+
+        if len(operands) == 1:
+            return operands[0]
+
+        return lambda step: max(operand(step) for operand in operands)
+
+    def conjunction(self) -> Robustness:
+        operands = [self.negation()]
+
+        while self.peek() == "and":
+            self.take()
+            operands.append(self.negation())
+
+        if len(operands) == 1:
+            return operands[0]
+
+        return lambda step: min(operand(step) for operand in operands)
+
+    def negation(self) -> Robustness:
+        token = self.peek()
+
+        if token == "not":
+            self.take()
+            operand = self.negation()
+            return lambda step: -operand(step)
+
+        if token == "(":
+            self.take()
+            expr = self.disjunction()
+            self.take(")")
+            return expr
+
+        if token in ("always", "historically", "eventually", "once"):
+            raise SpecificationError("Temporal operators are only supported at the top of a specification")
+
+        return self.predicate()
+
+    def predicate(self) -> Robustness:
+        lhs = _operand(self.take())
+        op = self.take()
+        rhs = _operand(self.take())
+
+        if op not in (">=", ">", "<=", "<"):
+            raise SpecificationError(f"Expected a comparison but found {op!r}")
+
+        if op in ("<=", "<"):
+            lhs, rhs = rhs, lhs
+
+        # The robustness of a >= b is a - b
+        if callable(lhs) and callable(rhs):
+            return lambda step: lhs(step) - rhs(step)
+
+        if callable(lhs):
+            return lambda step: lhs(step) - rhs
+
+        if callable(rhs):
+            return lambda step: lhs - rhs(step)
+
+        constant = lhs - rhs
+        return lambda step: constant
+
+
+class Monitor:
+    """Incremental robustness monitor for `always` specifications over the steps of a run.
+
+    Specifications have the form ``always (<formula>)`` where the formula combines comparisons
+    between the signals in `SIGNALS` and constants using ``and``, ``or`` and ``not``, for example
+    ``always (x >= 0 and x <= 8.0)``. The robustness of each step is the usual quantitative
+    semantics of the formula, and the robustness of the specification is the minimum over every
+    step seen so far, so it can only decrease as the run continues. Once it is negative the
+    specification is violated regardless of the remaining steps, which `decided` reports.
+    ``historically`` is accepted as a synonym of ``always``.
+    """
+
+    def __init__(self, spec: str):
+        parser = _Parser(_tokenize(spec))
+
+        if parser.peek() not in ("always", "historically"):
+            raise SpecificationError("Specification must begin with 'always'")
+
+        parser.take()
+        self._formula = parser.negation()
+
+        if parser.peek() is not None:
+            raise SpecificationError(f"Unexpected token {parser.peek()!r}")
+
+        self.spec = spec
+        self.robustness = math.inf
+
+    def update(self, step: Step) -> float:
+        """Add a step to the monitored trace, returning the robustness of the trace so far."""
+
+        value = self._formula(step)
+
+        if value < self.robustness:
+            self.robustness = value
+
+        return self.robustness
+
+    @property
+    def decided(self) -> bool:
+        """True if the verdict can no longer change for any continuation of the trace."""
+
+        return self.robustness < 0
@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from functools import cached_property
+from math import acos, asin, atan2, degrees, pi, sin, sqrt
+from typing import Literal
+
+import numpy as np
+from numpy.typing import NDArray
+
+from .automaton import Position
+
+Quaternion = tuple[float, float, float, float]
+
+
+def euler(q: Quaternion) -> tuple[float, float, float]:
+    """Convert a (w, x, y, z) quaternion into (roll, pitch, yaw) angles in radians.
+
+    This is the same conversion as `gz.math7.Quaterniond.euler`.
+    """
+
+    w, x, y, z = q
+    norm = sqrt(w * w + x * x + y * y + z * z)
+
+    if norm == 0.0:
+        return (0.0, 0.0, 0.0)
+
+    w, x, y, z = w / norm, x / norm, y / norm, z / norm
+    squ, sqx, sqy, sqz = w * w, x * x, y * y, z * z
+    sarg = -2 * (x * z - w * y)
+
+    if sarg <= -1.0:
+        pitch = -0.5 * pi
+    elif sarg >= 1.0:
+        pitch = 0.5 * pi
+    else:
+        pitch = asin(sarg)
+
+    if abs(sarg - 1) < 1e-15:
+        return (atan2(2 * (x * y - z * w), squ - sqx + sqy - sqz), pitch, 0.0)
+
+    if abs(sarg + 1) < 1e-15:
+        return (atan2(-2 * (x * y - z * w), squ - sqx + sqy - sqz), pitch, 0.0)
+
+    roll = atan2(2 * (y * z + w * x), squ - sqx - sqy + sqz)
+    yaw = atan2(2 * (x * y + w * z), squ + sqx - sqy - sqz)
+
+    return (roll, pitch, yaw)
+
+
+def slerp(q0: Quaternion, q1: Quaternion, t: float) -> Quaternion:
+    """Spherical linear interpolation between two unit (w, x, y, z) quaternions."""
+
+    w0, x0, y0, z0 = q0
+    w1, x1, y1, z1 = q1
+    dot = w0 * w1 + x0 * x1 + y0 * y1 + z0 * z1
+
+    # Interpolate along the shorter arc, since q and -q are the same rotation
+    if dot < 0.0:
+        w1, x1, y1, z1 = -w1, -x1, -y1, -z1
+        dot = -dot
+
+    if dot > 0.9995:
+        a, b = 1.0 - t, t
+    else:
+        theta = acos(dot)
+        a = sin((1.0 - t) * theta) / sin(theta)
+        b = sin(t * theta) / sin(theta)
+
+    w, x, y, z = a * w0 + b * w1, a * x0 + b * x1, a * y0 + b * y1, a * z0 + b * z1
+    norm = sqrt(w * w + x * x + y * y + z * z)
+
+    return (w / norm, x / norm, y / norm, z / norm)
+
+
+@dataclass(frozen=True)
+class PoseSample:
+    """Pose of the rover decoded from a single pose message.
+
+    The orientation is only converted into Euler angles the first time `heading` or `roll` is read.
+    `received` is the monotonic wall-clock time at which the message was received.
+    """
+
+    clock: float = field()
+    position: Position = field()
+    orientation: Quaternion = field(default=(1.0, 0.0, 0.0, 0.0))
+    received: float = field(default=0.0)
+
+    @cached_property
+    def _euler(self) -> tuple[float, float, float]:
+        return euler(self.orientation)
+
+    @property
+    def heading(self) -> float:
+        return degrees(self._euler[2])
+
+    @property
+    def roll(self) -> float:
+        return self._euler[1]
+
+
+@dataclass(frozen=True, slots=True)
+class MagnetometerSample:
+    """Magnetic field vector decoded from a single magnetometer message."""
+
+    clock: float = field()
+    vector: tuple[float, float, float] = field()
+    received: float = field(default=0.0)
+
+
+@dataclass(frozen=True, slots=True)
+class Snapshot:
+    """Coherent view of the vehicle sensors at a single point in time.
+
+    A snapshot satisfies the `automaton.Model` protocol, so it can be given to the automaton in
+    place of the vehicle to guarantee that every guard in a step observes the same values.
+    The receive times of the samples are zero if the vehicle is not driven by sensor messages.
+    """
+
+    clock: float = field()
+    position: Position = field()
+    heading: float = field()
+    heading_real: float = field()
+    roll: float = field()
+    pose_received: float = field(default=0.0)
+    magnetometer_received: float = field(default=0.0)
+
+
+Interpolation = Literal["linear", "slerp", "previous"]
+
+
+class SampleBuffer:
+    """Fixed-size ring buffer of timestamped sensor values stored in NumPy arrays.
+
+    Each record holds the simulation time of a message, a row of `width` values and the time the
+    message was received. Appending overwrites the oldest record once `capacity` records are
+    stored, so memory stays bounded. Records are written before the record count is published,
+    so a single writer may append while other threads read, as long as readers do not fall more
+    than `capacity` records behind. Reads return copies, since the writer overwrites records
+    in place.
+    """
+
+    def __init__(self, width: int, capacity: int = 4096):
+        self.capacity = capacity
+        # Records are rows of a single array so that appending is a single assignment
+        self._data: NDArray[np.float64] = np.zeros((capacity, width + 2))
+        self._clock = self._data[:, 0]
+        self._received = self._data[:, 1]
+        self._values = self._data[:, 2:]
+        self._count = 0
+
+    def __len__(self) -> int:
+        return min(self._count, self.capacity)
+
+    def append(self, clock: float, values: tuple[float, ...], received: float = 0.0):
+        self._data[self._count % self.capacity] = (clock, received, *values)
+        self._count += 1
+
+    def _index(self, position: int, count: int) -> int:
+        # Physical index of the record at `position` in chronological order
+        return (count - min(count, self.capacity) + position) % self.capacity
+
+    def latest(self) -> tuple[float, NDArray[np.float64]]:
+        count = self._count
+
+        if not count:
+            raise IndexError("Buffer is empty")
+
+        index = (count - 1) % self.capacity
+        return float(self._clock[index]), self._values[index].copy()
+
+    def at(self, clock: float, interpolation: Interpolation = "linear") -> tuple[float, NDArray[np.float64]]:
+        """Return the values at the simulation time `clock`, interpolated between records.
+
+        Times outside of the stored records use the first or last record. With "slerp", the last
+        four values of each record are treated as a (w, x, y, z) quaternion and interpolated
+        spherically while the others are interpolated linearly. With "previous" the values of the
+        last record at or before `clock` are returned.
+        """
+
+        count = self._count
+        size = min(count, self.capacity)
+
+        if not size:
+            raise IndexError("Buffer is empty")
+
+        # Find the first record after `clock` with a binary search over the chronological order
+        lo, hi = 0, size
+
+        while lo < hi:
+            mid = (lo + hi) // 2
+
+            if self._clock[self._index(mid, count)] <= clock:
+                lo = mid + 1
+            else:
+                hi = mid
+
+        if lo == 0:
+            index = self._index(0, count)
+            return float(self._clock[index]), self._values[index].copy()
+
+        i0 = self._index(lo - 1, count)
+
+        if lo == size or interpolation == "previous":
+            return float(self._clock[i0]), self._values[i0].copy()
+
+        i1 = self._index(lo, count)
+        t0 = self._clock[i0]
+        t1 = self._clock[i1]
+        f = (clock - t0) / (t1 - t0) if t1 > t0 else 0.0
+        values = self._values[i0] + f * (self._values[i1] - self._values[i0])
+
+        if interpolation == "slerp":
+            q0 = tuple(self._values[i0, -4:].tolist())
+            q1 = tuple(self._values[i1, -4:].tolist())
+            values[-4:] = slerp(q0, q1, f)  # type: ignore[arg-type]
+
+        return clock, values
+
+    def window(self, start: float, end: float) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+        """Return copies of the times and values of the records with times in [start, end]."""
+
+        count = self._count
+        size = min(count, self.capacity)
+        first = self._index(0, count)
+
+        if first + size <= self.capacity:
+            clocks = self._clock[first : first + size]
+            values = self._values[first : first + size]
+        else:
+            order = np.arange(first, first + size) % self.capacity
+            clocks = self._clock[order]
+            values = self._values[order]
+
+        lo = int(np.searchsorted(clocks, start, side="left"))
+        hi = int(np.searchsorted(clocks, end, side="right"))
+
+        if first + size <= self.capacity:
+            return clocks[lo:hi].copy(), values[lo:hi].copy()
+
+        return clocks[lo:hi], values[lo:hi]
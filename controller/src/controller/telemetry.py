@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import math
+import struct
+from dataclasses import dataclass, field
+from typing import Final
+
+import numpy as np
+from numpy.typing import NDArray
+
+MINIMUM: Final[float] = 1e-6
+"""Upper edge of the first histogram bin in seconds."""
+
+BINS_PER_DECADE: Final[int] = 10
+DECADES: Final[int] = 7
+
+BINS: Final[int] = BINS_PER_DECADE * DECADES + 2
+"""Number of bins of a histogram, including the underflow and overflow bins."""
+
+METRICS: Final[tuple[str, ...]] = (
+    "period",
+    "lateness",
+    "pose_age",
+    "magnetometer_age",
+    "step",
+    "publish",
+    "actuation",
+)
+"""Metrics recorded for every control tick, all measured in seconds of wall-clock time."""
+
+_SUMMARY = struct.Struct("<Qdddd")
+
+
+def edges() -> NDArray[np.float64]:
+    """Upper edges of the histogram bins, excluding the overflow bin."""
+
+    return MINIMUM * 10.0 ** (np.arange(BINS - 1) / BINS_PER_DECADE)
+
+
+@dataclass()
+class Histogram:
+    """Histogram of durations with logarithmically spaced bins and exact summary statistics.
+
+    Bins are spaced `BINS_PER_DECADE` per decade from `MINIMUM` over `DECADES` decades, so the
+    histogram has the same size for any number of values. Values at or below `MINIMUM`, including
+    negative values, are counted in the first bin and values above the last edge in the last bin.
+    """
+
+    counts: NDArray[np.uint32] = field(default_factory=lambda: np.zeros(BINS, dtype=np.uint32))
+    count: int = field(default=0)
+    minimum: float = field(default=math.inf)
+    maximum: float = field(default=-math.inf)
+    total: float = field(default=0.0)
+    squares: float = field(default=0.0)
+
+    def add(self, value: float):
+        if value <= MINIMUM:
+            index = 0
+        else:
+            index = min(math.ceil(math.log10(value / MINIMUM) * BINS_PER_DECADE), BINS - 1)
+
+        self.counts[index] += 1
+        self.count += 1
+        self.total += value
+        self.squares += value * value
+
+        if value < self.minimum:
+            self.minimum = value
+
+        if value > self.maximum:
+            self.maximum = value
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else math.nan
+
+    @property
+    def std(self) -> float:
+        if not self.count:
+            return math.nan
+
+        mean = self.mean
+        return math.sqrt(max(self.squares / self.count - mean * mean, 0.0))
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile as the upper edge of the bin containing it, clamped to the extrema."""
+
+        if not self.count:
+            return math.nan
+
+        index = int(np.searchsorted(np.cumsum(self.counts), q * self.count, side="left"))
+        upper = float(edges()[index]) if index < BINS - 1 else self.maximum
+
+        return min(max(upper, self.minimum), self.maximum)
+
+    def summary(self) -> dict[str, float]:
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "std": self.std,
+            "min": self.minimum if self.count else math.nan,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+            "max": self.maximum if self.count else math.nan,
+        }
+
+
+@dataclass()
+class Telemetry:
+    """Histograms of the timing of the control loop of a run, one for each name in `METRICS`."""
+
+    histograms: dict[str, Histogram] = field(default_factory=lambda: {name: Histogram() for name in METRICS})
+
+    def add(self, metric: str, value: float):
+        self.histograms[metric].add(value)
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        return {name: histogram.summary() for name, histogram in self.histograms.items()}
+
+    def encode(self) -> bytes:
+        parts = [struct.pack("<B", len(self.histograms))]
+
+        for name, histogram in self.histograms.items():
+            encoded = name.encode()
+            parts.append(struct.pack("<B", len(encoded)) + encoded)
+            parts.append(
+                _SUMMARY.pack(histogram.count, histogram.minimum, histogram.maximum, histogram.total, histogram.squares)
+            )
+            parts.append(histogram.counts.astype("<u4").tobytes())
+
+        return b"".join(parts)
+
+    @classmethod
+    def decode(cls, data: bytes, offset: int = 0) -> Telemetry:
+        (metrics,) = struct.unpack_from("<B", data, offset)
+        offset += 1
+        histograms: dict[str, Histogram] = {}
+
+        for _ in range(metrics):
+            (length,) = struct.unpack_from("<B", data, offset)
+            name = data[offset + 1 : offset + 1 + length].decode()
+            offset += 1 + length
+            count, minimum, maximum, total, squares = _SUMMARY.unpack_from(data, offset)
+            offset += _SUMMARY.size
+            counts = np.frombuffer(data, dtype="<u4", count=BINS, offset=offset).astype(np.uint32)
+            offset += counts.nbytes
+            histograms[name] = Histogram(counts, count, minimum, maximum, total, squares)
+
+        return cls(histograms)
@@ -1,32 +1,377 @@
 from __future__ import annotations
 
-from collections.abc import Iterable
+import asyncio
+import pickle
+from collections.abc import Callable, Iterable
 from itertools import repeat
+from queue import Empty, Queue
+from threading import Event, Lock, Thread
+from math import inf, nextafter
+from time import monotonic, sleep
 from pprint import pprint
 from logging import DEBUG, INFO, WARNING, Logger, NullHandler, basicConfig, getLogger
+from typing import Literal, TypeAlias
 
 import apscheduler.schedulers.blocking as sched
 import click
 import gzcm
 import numpy.random as rand
+import zmq
+import zmq.asyncio
 
 import rover
 import controller.messages as msgs
 import controller.attacks as atk
 import controller.automaton as ha
+import controller.kinematic as kin
+import controller.monitor as mon
+import controller.telemetry as tel
+
+Backend: TypeAlias = Literal["gazebo", "kinematic"]
+Mode: TypeAlias = Literal["realtime", "lockstep", "event"]
+
+Vehicle: TypeAlias = rover.NGC | kin.Ackermann
+
+LOCKSTEP_TIMEOUT: float = 5.0
+EVENT_TIMEOUT: float = 5.0
 
 
 class PublisherError(Exception):
     pass
 
 
+class _Run:
+    """The controller, vehicle and recorded history of a single simulation.
+
+    Unless the vehicle is `owned` by the run it is kept running by `finish`, so that a `Session`
+    can reuse it.
+    """
+
+    def __init__(
+        self,
+        vehicle: Vehicle,
+        step_size: float,
+        magnet: atk.Magnet,
+        speed: atk.SpeedController,
+        commands: Iterable[ha.Command | None],
+        *,
+        logger: Logger,
+        owned: bool = True,
+        on_step: Callable[[msgs.Step], bool] | None = None,
+        monitor: mon.Monitor | None = None,
+        stop_on_violation: bool = False,
+        telemetry: tel.Telemetry | None = None,
+    ):
+        self.vehicle = vehicle
+        self.owned = owned
+        self.controller = ha.Automaton(vehicle, step_size)
+        self.history: list[msgs.Step] = []
+        self.tstart = 0.0
+        self.clock = -inf
+        self.done = False
+        self._magnet = magnet
+        self._speed = speed
+        self._cmds = iter(commands)
+        self._on_step = on_step
+        self._monitor = monitor
+        self._stop_on_violation = stop_on_violation
+        self._telemetry = telemetry
+        self._logger = logger
+
+        if getLogger("automaton").isEnabledFor(INFO):
+            self.controller.subscribe(ha.LogSubscriber(vehicle))
+
+    def start(self):
+        self.tstart = self.vehicle.snapshot().clock
+
+        if isinstance(self.vehicle, rover.Rover):
+            self.vehicle.bus.reset()
+
+    def finish(self):
+        """Wait for the last actuator commands and record the statistics of the vehicle."""
+
+        vehicle = self.vehicle
+
+        if not isinstance(vehicle, rover.Rover):
+            return
+
+        vehicle.bus.drain(timeout=LOCKSTEP_TIMEOUT)
+        bus = vehicle.bus
+        rates = ", ".join(f"{sensor} {rate:.1f}" for sensor, rate in vehicle.sample_rates.items())
+        self._logger.info(f"Delivered sensor rates (msgs/sec): {rates}")
+        self._logger.info(f"Published {bus.published} actuator commands, dropped {bus.dropped} superseded commands")
+
+        if self._telemetry is not None:
+            self._telemetry.histograms["actuation"] = bus.latency
+
+        if self.owned:
+            bus.close(timeout=LOCKSTEP_TIMEOUT)
+
+    def tick(self, period: float | None, lateness: float | None):
+        """Record the timing of a tick of the control loop, if the run collects telemetry."""
+
+        if self._telemetry is not None:
+            if period is not None:
+                self._telemetry.add("period", period)
+
+            if lateness is not None:
+                self._telemetry.add("lateness", lateness)
+
+    def update(self, clock: float | None = None) -> bool:
+        """Record a step and run the controller, returning True once the run is finished.
+
+        If `clock` is given the sensors are read at that simulation time instead of using the
+        latest samples.
+        """
+
+        self.done = self._update(clock)
+        return self.done
+
+    def _update(self, clock: float | None) -> bool:
+        vehicle = self.vehicle
+        controller = self.controller
+        telemetry = self._telemetry
+        self._magnet.seek(len(self.history))
+        snapshot = vehicle.snapshot(clock)
+        self.clock = snapshot.clock
+
+        if telemetry is not None:
+            now = monotonic()
+
+            if snapshot.pose_received:
+                telemetry.add("pose_age", now - snapshot.pose_received)
+
+            if snapshot.magnetometer_received:
+                telemetry.add("magnetometer_age", now - snapshot.magnetometer_received)
+        tsim = snapshot.clock - self.tstart
+        self._logger.debug("Running controller step.")
+        step = msgs.Step(
+            time=tsim,
+            position=snapshot.position,
+            heading=snapshot.heading,
+            roll=snapshot.roll,
+            state=controller.state,
+        )
+        self.history.append(step)
+        stop = self._on_step is not None and not self._on_step(step)
+
+        if self._monitor is not None:
+            self._monitor.update(step)
+
+            if self._stop_on_violation and self._monitor.decided:
+                self._logger.info(f"Specification violated with robustness {self._monitor.robustness:.4f}.")
+                stop = True
+
+        if stop:
+            self._logger.info("Run cancelled. Stopping vehicle.")
+            vehicle.velocity = 0.0
+            vehicle.steering_angle = 0.0
+            vehicle.flush()
+            return True
+
+        action = controller.action
+        speed = self._speed.speed(tsim)
+        tpublish = monotonic()
+
+        if action is ha.Action.STOP:
+            vehicle.velocity = 0.0
+        else:
+            vehicle.velocity = speed
+
+        if action is ha.Action.TURN:
+            vehicle.steering_angle = 0.5
+        else:
+            vehicle.steering_angle = 0.0
+
+        vehicle.flush()
+
+        if telemetry is not None:
+            telemetry.add("publish", monotonic() - tpublish)
+
+        if controller.state.is_terminal():
+            return True
+
+        tstep = monotonic()
+        controller.step(next(self._cmds), snapshot)
+
+        if telemetry is not None:
+            telemetry.add("step", monotonic() - tstep)
+
+        return False
+
+
+class _Ticks:
+    """Wall-clock timing of the ticks of a control loop.
+
+    The lateness of a tick is measured from the time it would have run if every tick ran exactly
+    one step after the first, so it is only recorded for loops driven by a timer.
+    """
+
+    def __init__(self, step_size: float, *, scheduled: bool):
+        self._step_size = step_size
+        self._scheduled = scheduled
+        self._ticks = 0
+        self._first = 0.0
+        self._previous = 0.0
+
+    def tick(self) -> tuple[float | None, float | None]:
+        """Start a tick, returning its period and lateness if they are known."""
+
+        now = monotonic()
+
+        if self._ticks == 0:
+            self._first = now
+            period = lateness = None
+        else:
+            period = now - self._previous
+            lateness = now - (self._first + self._ticks * self._step_size) if self._scheduled else None
+
+        self._ticks += 1
+        self._previous = now
+
+        return period, lateness
+
+
+def _sample_rate(mode: Mode) -> rover.SampleRate:
+    # Sensor messages are not throttled in lockstep mode since the final message of each step
+    # must not be dropped, or in event mode since it steps as soon as fresh samples arrive.
+    return rover.UNTHROTTLED if mode in ("lockstep", "event") else rover.SampleRate()
+
+
+def _loop(runs: list[_Run], world: str, step_size: float, mode: Mode, logger: Logger):
+    """Update every run on a shared control tick until all of them are finished."""
+
+    for run_ in runs:
+        run_.vehicle.wait()
+        run_.start()
+
+    scheduled = mode == "realtime" and not all(isinstance(run_.vehicle, kin.Ackermann) for run_ in runs)
+    ticks = _Ticks(step_size, scheduled=scheduled)
+
+    def update(clock: float | None = None) -> bool:
+        period, lateness = ticks.tick()
+
+        for run_ in runs:
+            if not run_.done:
+                run_.tick(period, lateness)
+                run_.update(clock)
+
+        return all(run_.done for run_ in runs)
+
+    if all(isinstance(run_.vehicle, kin.Ackermann) for run_ in runs):
+        logger.debug("Stepping kinematic model without scheduler")
+
+        while not update():
+            for run_ in runs:
+                run_.vehicle.step(step_size)
+
+        logger.info("Found terminal state.")
+        return
+
+    if mode == "lockstep":
+        world_ = rover.world(world)
+        world_.pause()
+
+        for run_ in runs:
+            run_.start()
+
+        tstart = runs[0].tstart
+        steps = 0
+
+        # Sensors are read at the exact time of each step, since the world may have published
+        # samples slightly after it when it paused.
+        try:
+            while not update(tstart + steps * step_size):
+                steps += 1
+                tnext = tstart + steps * step_size
+
+                # The commands of the step must reach the world before it advances
+                for run_ in runs:
+                    if isinstance(run_.vehicle, rover.Rover) and not run_.vehicle.bus.drain(timeout=LOCKSTEP_TIMEOUT):
+                        raise rover.RoverError(f"Timed out publishing actuator commands at time {tnext:.4f}")
+
+                world_.run_to(tnext)
+
+                for run_ in runs:
+                    if not run_.vehicle.wait_until(tnext, timeout=LOCKSTEP_TIMEOUT):
+                        raise rover.RoverError(f"Timed out waiting for sensor messages at time {tnext:.4f}")
+        finally:
+            world_.resume()
+
+        logger.info("Found terminal state.")
+        return
+
+    if mode == "event":
+        # Each tick waits for samples newer than the ones used by the previous tick of every run,
+        # and ticks start at least one step apart so that the frequency caps the rate of the loop.
+        tnext = 0.0
+
+        while True:
+            delay = tnext - monotonic()
+
+            if delay > 0:
+                sleep(delay)
+
+            for run_ in runs:
+                if not run_.done and not run_.vehicle.wait_until(nextafter(run_.clock, inf), timeout=EVENT_TIMEOUT):
+                    raise rover.RoverError(f"Timed out waiting for sensor messages after time {run_.clock:.4f}")
+
+            tnext = monotonic() + step_size
+
+            if update():
+                break
+
+        logger.info("Found terminal state.")
+        return
+
+    scheduler = sched.BlockingScheduler()
+
+    def control_loop():
+        if update():
+            logger.info("Found terminal state. Shutting down scheduler.")
+            scheduler.remove_all_jobs()
+            scheduler.shutdown(wait=False)
+
+    logger.debug("Creating controller scheduler job")
+    scheduler.add_job(control_loop, "interval", seconds=step_size, id="control_loop")
+
+    logger.debug("Starting scheduler")
+    scheduler.start()
+
+
 def run(
     world: str,
     frequency: int,
     magnet: atk.Magnet | None,
     speed: atk.SpeedController | None,
     commands: Iterable[ha.Command | None],
+    *,
+    backend: Backend = "gazebo",
+    mode: Mode = "realtime",
+    on_step: Callable[[msgs.Step], bool] | None = None,
+    monitor: mon.Monitor | None = None,
+    stop_on_violation: bool = False,
+    vehicle: Vehicle | None = None,
+    telemetry: tel.Telemetry | None = None,
 ) -> list[msgs.Step]:
+    """Run the controller until it reaches a terminal state.
+
+    In realtime mode the controller steps on a wall-clock timer, in lockstep mode the world is
+    advanced by exactly one step at a time, and in event mode the controller steps as soon as new
+    sensor samples arrive but at most once per `1/frequency` seconds.
+
+    If `vehicle` is provided it is used instead of creating a vehicle for the backend, which lets
+    a rover be reused between runs. It must already be reset and use `magnet`, and it is left
+    running when the run finishes.
+
+    If provided, `on_step` is called with every recorded step. The run stops early and the vehicle
+    is halted if it returns False. Every recorded step is also added to `monitor`, and if
+    `stop_on_violation` is set the run stops in the same way once the monitor has decided that
+    the specification is violated.
+
+    If provided, the timing of the control loop is recorded in `telemetry`.
+    """
+
     logger = getLogger("controller.simulation")
     logger.addHandler(NullHandler())
 
@@ -39,55 +384,257 @@ def run(
     speed_ctl = speed or atk.FixedSpeed(5.0)
     logger.info(f"Speed: {speed_ctl}")
 
-    vehicle = rover.ngc(world, magnet=magnet)
-    controller = ha.Automaton(vehicle, step_size)
-    scheduler = sched.BlockingScheduler()
-    history: list[msgs.Step] = []
-    cmds = iter(commands)
-
-    vehicle.wait()
-    tstart = vehicle.clock
-
-    def update():
-        tsim = vehicle.clock - tstart
-        logger.debug("Running controller step.")
-        history.append(
-            msgs.Step(
-                time=tsim,
-                position=vehicle.position,
-                heading=vehicle.heading,
-                roll=vehicle.roll,
-                state=controller.state,
-            )
+    owned = vehicle is None
+
+    if vehicle is not None:
+        logger.info("Reusing existing vehicle")
+    elif backend == "kinematic":
+        vehicle = kin.ackermann(magnet=magnet)
+    else:
+        vehicle = rover.ngc(world, magnet=magnet, frequency=frequency, rate=_sample_rate(mode))
+
+    run_ = _Run(
+        vehicle,
+        step_size,
+        magnet,
+        speed_ctl,
+        commands,
+        logger=logger,
+        owned=owned,
+        on_step=on_step,
+        monitor=monitor,
+        stop_on_violation=stop_on_violation,
+        telemetry=telemetry,
+    )
+    _loop([run_], world, step_size, mode, logger)
+    run_.finish()
+
+    return run_.history
+
+
+def run_batch(starts: list[msgs.Start], session: Session | None = None) -> list[msgs.Result]:
+    """Run several simulations in the same world on a shared control tick.
+
+    Every simulation gets its own uniquely named rover, magnet, speed controller and automaton.
+    All of the starts must use the same world, frequency, backend and mode. If `session` is given
+    the rovers are acquired from it, so that later batches reuse them instead of creating a new
+    fleet.
+    """
+
+    logger = getLogger("controller.simulation")
+    logger.addHandler(NullHandler())
+
+    if not starts:
+        return []
+
+    first = starts[0]
+    shared = {(s.world, s.frequency, s.backend, s.mode) for s in starts}
+
+    if len(shared) > 1:
+        raise ValueError("All simulations of a batch must use the same world, frequency, backend and mode")
+
+    step_size = 1.0 / first.frequency
+    magnets = [start.magnet or atk.StationaryMagnet(0.0) for start in starts]
+    logger.info(f"Running batch of {len(starts)} simulations with step size {step_size}")
+
+    if first.backend == "kinematic":
+        vehicles: list[Vehicle] = [kin.ackermann(magnet=magnet) for magnet in magnets]
+    elif session is not None:
+        vehicles = []
+
+        try:
+            for magnet in magnets:
+                vehicles.append(session.acquire(first.world, magnet, frequency=first.frequency, mode=first.mode))
+        except Exception:
+            for vehicle in vehicles:
+                session.release(vehicle)
+
+            raise
+    else:
+        rate = _sample_rate(first.mode)
+        vehicles = rover.ngc_fleet(first.world, magnets=magnets, frequency=first.frequency, rate=rate)
+
+    owned = first.backend == "kinematic" or session is None
+
+    monitors = [mon.Monitor(start.spec) if start.spec else None for start in starts]
+    telemetries = [tel.Telemetry() for _ in starts]
+    runs = [
+        _Run(
+            vehicle,
+            step_size,
+            magnet,
+            start.speed or atk.FixedSpeed(5.0),
+            start.commands,
+            logger=logger,
+            owned=owned,
+            monitor=monitor,
+            stop_on_violation=start.stop_on_violation,
+            telemetry=telemetry,
         )
+        for vehicle, magnet, start, monitor, telemetry in zip(vehicles, magnets, starts, monitors, telemetries)
+    ]
 
-        action = controller.action
-        speed = speed_ctl.speed(tsim)
+    try:
+        _loop(runs, first.world, step_size, first.mode, logger)
 
-        if action is ha.Action.STOP:
-            vehicle.velocity = 0.0
-        else:
-            vehicle.velocity = speed
+        for run_ in runs:
+            run_.finish()
+    finally:
+        if not owned:
+            for vehicle in vehicles:
+                session.release(vehicle)
 
-        if action is ha.Action.TURN:
-            vehicle.steering_angle = 0.5
-        else:
-            vehicle.steering_angle = 0.0
+    return [
+        msgs.Result.from_steps(run_.history, robustness=monitor.robustness if monitor else None, telemetry=telemetry)
+        for run_, monitor, telemetry in zip(runs, monitors, telemetries)
+    ]
 
-        if controller.state.is_terminal():
-            logger.info("Found terminal state. Shutting down scheduler.")
-            scheduler.remove_all_jobs()
-            scheduler.shutdown(wait=False)
-        else:
-            controller.step(next(cmds))
 
-    logger.debug("Creating controller scheduler job")
-    scheduler.add_job(update, "interval", seconds=step_size, id="control_loop")
+async def _wait_for_samples(run_: _Run, updated: asyncio.Event):
+    vehicle = run_.vehicle
+    clock = nextafter(run_.clock, inf)
+    deadline = monotonic() + EVENT_TIMEOUT
 
-    logger.debug("Starting scheduler")
-    scheduler.start()
+    # The event is cleared before checking the samples so that a message received between the
+    # check and the wait sets it again.
+    while True:
+        updated.clear()
+
+        if vehicle.wait_until(clock, timeout=0):
+            return
+
+        try:
+            await asyncio.wait_for(updated.wait(), max(deadline - monotonic(), 0.0))
+        except asyncio.TimeoutError:
+            raise rover.RoverError(f"Timed out waiting for sensor messages after time {run_.clock:.4f}") from None
+
+
+async def _loop_async(run_: _Run, step_size: float, mode: Mode, logger: Logger):
+    """Update a run from the event loop until it is finished."""
+
+    vehicle = run_.vehicle
+
+    if isinstance(vehicle, kin.Ackermann):
+        logger.debug("Stepping kinematic model without timer")
+        run_.start()
+
+        # The kinematic model never blocks, so the loop is yielded to after every step to let the
+        # other sessions run.
+        while not run_.update():
+            vehicle.step(step_size)
+            await asyncio.sleep(0)
+
+        logger.info("Found terminal state.")
+        return
+
+    await asyncio.to_thread(vehicle.wait)
+    run_.start()
+    ticks = _Ticks(step_size, scheduled=mode == "realtime")
+
+    def update() -> bool:
+        run_.tick(*ticks.tick())
+        return run_.update()
+
+    if mode == "event":
+        loop = asyncio.get_running_loop()
+        updated = asyncio.Event()
+
+        def notify():
+            if not updated.is_set():
+                loop.call_soon_threadsafe(updated.set)
+
+        remove = vehicle.listen(notify)
+        tnext = 0.0
+
+        try:
+            while True:
+                await asyncio.sleep(max(tnext - monotonic(), 0.0))
+                await _wait_for_samples(run_, updated)
+                tnext = monotonic() + step_size
+
+                if update():
+                    break
+        finally:
+            remove()
+
+        logger.info("Found terminal state.")
+        return
+
+    # Ticks that were missed because the loop was busy are skipped instead of run late, like the
+    # coalesced jobs of the scheduler used by `run`.
+    tnext = monotonic()
+
+    while not update():
+        now = monotonic()
+
+        while tnext <= now:
+            tnext += step_size
+
+        await asyncio.sleep(tnext - now)
+
+    logger.info("Found terminal state.")
+
+
+async def run_async(
+    world: str,
+    frequency: int,
+    magnet: atk.Magnet | None,
+    speed: atk.SpeedController | None,
+    commands: Iterable[ha.Command | None],
+    *,
+    backend: Backend = "gazebo",
+    mode: Mode = "realtime",
+    on_step: Callable[[msgs.Step], bool] | None = None,
+    monitor: mon.Monitor | None = None,
+    stop_on_violation: bool = False,
+    vehicle: Vehicle | None = None,
+    telemetry: tel.Telemetry | None = None,
+) -> list[msgs.Step]:
+    """Run the controller in the running event loop until it reaches a terminal state.
+
+    This is the same as `run`, except that the control tick is driven by timers of the event loop
+    and sensor messages wake the loop through `Rover.listen`, so many runs can share one thread.
+    Lockstep mode is not supported since it pauses the world shared by every run in it.
+    """
+
+    logger = getLogger("controller.simulation")
+    logger.addHandler(NullHandler())
+
+    if mode == "lockstep":
+        raise ValueError("Lockstep mode cannot be used with concurrent runs")
+
+    step_size: float = 1.0/frequency
+    magnet = magnet or atk.StationaryMagnet(0.0)
+    speed_ctl = speed or atk.FixedSpeed(5.0)
+
+    owned = vehicle is None
+
+    if vehicle is not None:
+        logger.info("Reusing existing vehicle")
+    elif backend == "kinematic":
+        vehicle = kin.ackermann(magnet=magnet)
+    else:
+        vehicle = await asyncio.to_thread(
+            rover.ngc, world, magnet=magnet, frequency=frequency, rate=_sample_rate(mode)
+        )
 
-    return history
+    run_ = _Run(
+        vehicle,
+        step_size,
+        magnet,
+        speed_ctl,
+        commands,
+        logger=logger,
+        owned=owned,
+        on_step=on_step,
+        monitor=monitor,
+        stop_on_violation=stop_on_violation,
+        telemetry=telemetry,
+    )
+    await _loop_async(run_, step_size, mode, logger)
+    await asyncio.to_thread(run_.finish)
+
+    return run_.history
 
 
 @click.group()
@@ -108,15 +655,308 @@ def controller(ctx: click.Context, verbose: bool):
     ctx.obj["logger"] = logger
 
 
-@gzcm.serve(msgtype=msgs.Start)
-def server(msg: msgs.Start) -> msgs.Result:
-    return msgs.Result(run(msg.world, msg.frequency, msg.magnet, msg.speed, msg.commands))
+class Session:
+    """Rovers kept alive between the runs served by a single controller process.
+
+    Runs acquire an idle rover in their world, which has its pose, actuators and magnet reset, and
+    release it when they finish. Rovers subscribe to their sensors at the rate used by the mode of
+    the run that created them, so only rovers with the same rate are reused. A new rover is only
+    created when no such rover is idle, placed `spacing` meters from the others along the y axis
+    like the rovers of a fleet.
+    """
+
+    def __init__(self, *, spacing: float = 50.0):
+        self.spacing = spacing
+        self._idle: dict[tuple[str, int | None], list[rover.NGC]] = {}
+        self._keys: dict[int, tuple[str, int | None]] = {}
+        self._created: dict[str, int] = {}
+        self._lock = Lock()
+        self._logger = getLogger("controller.session")
+        self._logger.addHandler(NullHandler())
+
+    def acquire(self, world: str, magnet: atk.Magnet | None, *, frequency: float, mode: Mode) -> rover.NGC:
+        magnet = magnet or atk.StationaryMagnet(0.0)
+        rate = _sample_rate(mode)
+        key = (world, rate.msgs_per_sec(frequency))
+
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            vehicle = idle.pop() if idle else None
+            index = self._created.get(world, 0)
+
+            if vehicle is None:
+                self._created[world] = index + 1
+
+        if vehicle is not None:
+            vehicle.reset(magnet)
+            return vehicle
+
+        if index == 0:
+            name, origin = "ackermann", None
+        else:
+            name, origin = f"ackermann_{index}", (0.0, index * self.spacing, 0.0)
+
+        self._logger.info(f"Creating session rover {name} in world {world}")
+        vehicle = rover.ngc(world, magnet=magnet, name=name, frequency=frequency, rate=rate, origin=origin)
+
+        with self._lock:
+            self._keys[id(vehicle)] = key
+
+        return vehicle
+
+    def release(self, vehicle: rover.NGC):
+        with self._lock:
+            self._idle[self._keys[id(vehicle)]].append(vehicle)
+
+
+def server(session: Session | None) -> Callable[[int], None]:
+    @gzcm.serve(msgtype=msgs.Start)
+    def inner(msg: msgs.Start) -> msgs.Result:
+        monitor = mon.Monitor(msg.spec) if msg.spec else None
+        telemetry = tel.Telemetry()
+        vehicle = (
+            session.acquire(msg.world, msg.magnet, frequency=msg.frequency, mode=msg.mode)
+            if session and msg.backend == "gazebo"
+            else None
+        )
+
+        try:
+            history = run(
+                msg.world,
+                msg.frequency,
+                msg.magnet,
+                msg.speed,
+                msg.commands,
+                backend=msg.backend,
+                mode=msg.mode,
+                monitor=monitor,
+                stop_on_violation=msg.stop_on_violation,
+                vehicle=vehicle,
+                telemetry=telemetry,
+            )
+        finally:
+            if session and vehicle is not None:
+                session.release(vehicle)
+
+        return msgs.Result.from_steps(history, robustness=monitor.robustness if monitor else None, telemetry=telemetry)
+
+    return inner
+
+
+def batch_server(session: Session | None) -> Callable[[int], None]:
+    @gzcm.serve(msgtype=msgs.Batch)
+    def inner(msg: msgs.Batch) -> msgs.BatchResult:
+        return msgs.BatchResult(run_batch(msg.starts, session))
+
+    return inner
 
 
 @controller.command()
 @click.option("-p", "--port", type=int, default=5556)
-def serve(port: int):
-    server(port)
+@click.option("--session/--no-session", default=True, help="Reuse the rovers between runs instead of creating them for every run")
+@click.option("--batch", is_flag=True, help="Serve batches of simulations run in the same world")
+def serve(port: int, session: bool, batch: bool):
+    factory = batch_server if batch else server
+    factory(Session() if session else None)(port)
+
+
+def _stream(socket: zmq.Socket, client: bytes, request: msgs.Stream, session: Session):
+    """Run a streamed simulation, sending batches of steps to the client as they are recorded.
+
+    The simulation runs on a separate thread so that this thread can own the socket, forwarding
+    the batches queued by the simulation and listening for a cancellation from the client. Rovers
+    are acquired from `session`, so successive simulations reuse the same rover.
+    """
+
+    logger = getLogger("controller.stream")
+    outbox: Queue[msgs.Progress | msgs.Result | msgs.Failure] = Queue()
+    cancelled = Event()
+    pending: list[msgs.Step] = []
+
+    def on_step(step: msgs.Step) -> bool:
+        pending.append(step)
+
+        if len(pending) >= request.batch:
+            outbox.put(msgs.Progress(pending.copy()))
+            pending.clear()
+
+        return not cancelled.is_set()
+
+    def simulate():
+        start = request.start
+        monitor = mon.Monitor(start.spec) if start.spec else None
+        telemetry = tel.Telemetry()
+        vehicle = None
+
+        try:
+            if start.backend == "gazebo":
+                vehicle = session.acquire(start.world, start.magnet, frequency=start.frequency, mode=start.mode)
+
+            history = run(
+                start.world,
+                start.frequency,
+                start.magnet,
+                start.speed,
+                start.commands,
+                backend=start.backend,
+                mode=start.mode,
+                on_step=on_step,
+                monitor=monitor,
+                stop_on_violation=start.stop_on_violation,
+                vehicle=vehicle,
+                telemetry=telemetry,
+            )
+        except Exception as e:
+            logger.exception("Streamed simulation failed")
+            outbox.put(msgs.Failure(repr(e)))
+        else:
+            if pending:
+                outbox.put(msgs.Progress(pending.copy()))
+
+            robustness = monitor.robustness if monitor else None
+            result = msgs.Result.from_steps(
+                history,
+                cancelled=cancelled.is_set(),
+                robustness=robustness,
+                telemetry=telemetry,
+            )
+            outbox.put(result)
+        finally:
+            if vehicle is not None:
+                session.release(vehicle)
+
+    worker = Thread(target=simulate, name="simulation")
+    worker.start()
+
+    while True:
+        while socket.poll(timeout=0):
+            sender, payload = socket.recv_multipart()
+            msg = pickle.loads(payload)
+
+            if sender == client and isinstance(msg, msgs.Cancel):
+                logger.info("Received cancellation from client")
+                cancelled.set()
+            elif isinstance(msg, msgs.Stream):
+                # Only one simulation runs at a time, so other clients are turned away instead of
+                # waiting for a reply that never comes.
+                logger.info("Rejecting simulation received while busy")
+                socket.send_multipart([sender, pickle.dumps(msgs.Failure("busy"))])
+            else:
+                logger.warning(f"Ignoring message {type(msg).__name__} received during simulation")
+
+        try:
+            item = outbox.get(timeout=0.01)
+        except Empty:
+            continue
+
+        socket.send_multipart([client, pickle.dumps(item)])
+
+        if not isinstance(item, msgs.Progress):
+            break
+
+    worker.join()
+
+
+@controller.command()
+@click.option("-p", "--port", type=int, default=5557)
+def stream(port: int):
+    """Serve streamed simulations that clients can cancel while they run.
+
+    Requests are unpickled, so the port must not be exposed to untrusted networks.
+    """
+
+    logger = getLogger("controller.stream")
+    socket = zmq.Context.instance().socket(zmq.ROUTER)
+    socket.bind(f"tcp://*:{port}")
+    session = Session()
+    logger.info(f"Listening for streamed simulations on port {port}")
+
+    while True:
+        client, payload = socket.recv_multipart()
+        msg = pickle.loads(payload)
+
+        if isinstance(msg, msgs.Stream):
+            _stream(socket, client, msg, session)
+        else:
+            logger.warning(f"Ignoring unexpected message {type(msg).__name__}")
+
+
+async def _serve_session(socket: zmq.asyncio.Socket, client: bytes, msg: msgs.Start, session: Session):
+    logger = getLogger("controller.sessions")
+    monitor = mon.Monitor(msg.spec) if msg.spec else None
+    telemetry = tel.Telemetry()
+    vehicle = None
+
+    try:
+        if msg.backend == "gazebo":
+            vehicle = await asyncio.to_thread(
+                session.acquire, msg.world, msg.magnet, frequency=msg.frequency, mode=msg.mode
+            )
+
+        history = await run_async(
+            msg.world,
+            msg.frequency,
+            msg.magnet,
+            msg.speed,
+            msg.commands,
+            backend=msg.backend,
+            mode=msg.mode,
+            monitor=monitor,
+            stop_on_violation=msg.stop_on_violation,
+            vehicle=vehicle,
+            telemetry=telemetry,
+        )
+    except Exception as e:
+        logger.exception("Session simulation failed")
+        reply: msgs.Result | msgs.Failure = msgs.Failure(repr(e))
+    else:
+        robustness = monitor.robustness if monitor else None
+        reply = msgs.Result.from_steps(history, robustness=robustness, telemetry=telemetry)
+    finally:
+        if vehicle is not None:
+            session.release(vehicle)
+
+    await socket.send_multipart([client, pickle.dumps(reply)])
+
+
+async def _serve_sessions(port: int, limit: int):
+    logger = getLogger("controller.sessions")
+    socket = zmq.asyncio.Context.instance().socket(zmq.ROUTER)
+    socket.bind(f"tcp://*:{port}")
+    session = Session()
+    slots = asyncio.Semaphore(limit)
+    tasks: set[asyncio.Task[None]] = set()
+    logger.info(f"Listening for concurrent simulations on port {port}")
+
+    async def serve_one(client: bytes, msg: msgs.Start):
+        async with slots:
+            await _serve_session(socket, client, msg, session)
+
+    while True:
+        client, payload = await socket.recv_multipart()
+        msg = pickle.loads(payload)
+
+        if not isinstance(msg, msgs.Start):
+            logger.warning(f"Ignoring unexpected message {type(msg).__name__}")
+            continue
+
+        # References to the tasks are kept until they finish since the loop only keeps weak ones
+        task = asyncio.create_task(serve_one(client, msg))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+
+@controller.command()
+@click.option("-p", "--port", type=int, default=5558)
+@click.option("-n", "--max-sessions", type=int, default=8, help="Maximum number of simulations running at once")
+def sessions(port: int, max_sessions: int):
+    """Serve concurrent simulations from a single process, replying to each with its result.
+
+    This is the endpoint used by `SessionExecutor` in the test harness. Requests are unpickled, so
+    the port must not be exposed to untrusted networks.
+    """
+
+    asyncio.run(_serve_sessions(port, max_sessions))
 
 
 @controller.command()
@@ -125,18 +965,22 @@ def serve(port: int):
 @click.option("-f", "--frequency", type=int, default=1)
 @click.option("-s", "--speed", type=float, default=5.0)
 @click.option("-m", "--magnet", nargs=2, type=float, default=None)
+@click.option("-b", "--backend", type=click.Choice(["gazebo", "kinematic"]), default="gazebo")
+@click.option("--mode", type=click.Choice(["realtime", "lockstep", "event"]), default="realtime")
 def start(
     ctx: click.Context,
     world: str,
     frequency: int,
     speed: float,
-    magnet: tuple[float, float] | None
+    magnet: tuple[float, float] | None,
+    backend: Backend,
+    mode: Mode,
 ):
     logger: Logger = ctx.obj["logger"]
     logger.info("No port specified, starting controller using defaults.")
     magnet_: atk.Magnet = atk.GaussianMagnet(magnet[0], magnet[1], rand.default_rng()) if magnet else atk.StationaryMagnet(0.0)
     speed_ = atk.FixedSpeed(speed)
-    history = run(world, frequency, magnet_, speed_, commands=repeat(None))
+    history = run(world, frequency, magnet_, speed_, commands=repeat(None), backend=backend, mode=mode)
 
     pprint(history)
 
@@ -1,21 +1,25 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from logging import Logger, NullHandler, getLogger
-from math import atan, pi
-from threading import Event, Lock
-from typing import Literal, NewType
+from logging import DEBUG, Logger, NullHandler, getLogger
+from math import atan, ceil, inf, nextafter, pi
+from threading import Condition, Event, Thread
+from time import monotonic
+from typing import Any, Callable, Literal, NewType
 
 from gz.transport13 import Node, Publisher, SubscribeOptions
-from gz.math7 import Quaterniond
 from gz.msgs10.actuators_pb2 import Actuators
 from gz.msgs10.boolean_pb2 import Boolean
 from gz.msgs10.double_pb2 import Double
 from gz.msgs10.entity_factory_pb2 import EntityFactory
 from gz.msgs10.magnetometer_pb2 import Magnetometer
+from gz.msgs10.pose_pb2 import Pose
 from gz.msgs10.pose_v_pb2 import Pose_V
+from gz.msgs10.world_control_pb2 import WorldControl
 
 from controller import attacks, automaton
+from controller.sensors import MagnetometerSample, PoseSample, SampleBuffer, Snapshot
+from controller.telemetry import Histogram
 
 
 def _pose_logger() -> Logger:
@@ -25,103 +29,261 @@ def _pose_logger() -> Logger:
     return logger
 
 
+def _listen(handler: MagnetometerHandler | PoseHandler, listener: Callable[[], None]) -> Callable[[], None]:
+    # The list of listeners is replaced instead of mutated so that the transport thread can
+    # iterate over it without a lock.
+    handler._listeners = [*handler._listeners, listener]
+
+    def remove():
+        handler._listeners = [other for other in handler._listeners if other is not listener]
+
+    return remove
+
+
+def _rate(messages: int, first: float, last: float) -> float:
+    return (messages - 1) / (last - first) if messages > 1 and last > first else 0.0
+
+
 @dataclass()
 class MagnetometerHandler:
-    _vector: tuple[float, float, float] = field(default=(0.0, 0.0, 0.0), init=False)
-    _lock: Lock = field(default_factory=Lock, init=False)
+    """Handler for magnetometer messages.
+
+    Each message is decoded into an immutable sample which replaces the previous sample by
+    swapping a single reference, so readers never observe a partially updated sample and do not
+    need to acquire a lock. The samples are also recorded in `history`, a bounded buffer which can
+    be read at any simulation time it covers.
+    """
+
+    history: SampleBuffer = field(default_factory=lambda: SampleBuffer(3), init=False)
+    _sample: MagnetometerSample = field(default=MagnetometerSample(0.0, (0.0, 0.0, 0.0)), init=False)
     _ready: Event = field(default_factory=Event, init=False)
+    _updated: Condition = field(default_factory=Condition, init=False)
+    _messages: int = field(default=0, init=False)
+    _first: float = field(default=0.0, init=False)
+    _listeners: list[Callable[[], None]] = field(default_factory=list, init=False)
 
     def __call__(self, msg: Magnetometer):
-        with self._lock:
-            field = msg.field_tesla
-            self._vector = (field.x, field.y, field.z)
+        stamp = msg.header.stamp
+        field = msg.field_tesla
+        received = monotonic()
+        sample = MagnetometerSample(stamp.sec + stamp.nsec / 1e9, (field.x, field.y, field.z), received)
+        self.history.append(sample.clock, sample.vector, received)
+        self._sample = sample
+
+        if not self._messages:
+            self._first = received
+
+        self._messages += 1
+
+        with self._updated:
+            self._updated.notify_all()
 
         if not self._ready.is_set():
             self._ready.set()
 
+        for listener in self._listeners:
+            listener()
+
+    @property
+    def sample(self) -> MagnetometerSample:
+        return self._sample
+
+    def at(self, clock: float) -> MagnetometerSample:
+        """Return the field at the simulation time `clock`, interpolated between samples."""
+
+        clock, vector = self.history.at(clock)
+        x, y, z = vector.tolist()
+
+        return MagnetometerSample(clock, (x, y, z), self._sample.received)
+
+    def listen(self, listener: Callable[[], None]) -> Callable[[], None]:
+        """Call `listener` on the transport thread after each message until the returned function is called."""
+
+        return _listen(self, listener)
+
+    @property
+    def delivered_rate(self) -> float:
+        """Average number of messages received per second of wall-clock time."""
+
+        return _rate(self._messages, self._first, self._sample.received)
+
     @property
     def vector(self) -> tuple[float, float, float]:
-        with self._lock:
-            return self._vector
+        return self._sample.vector
 
     @property
     def x(self) -> float:
-        with self._lock:
-            return self._vector[0]
+        return self._sample.vector[0]
 
     @property
     def y(self) -> float:
-        with self._lock:
-            return self._vector[1]
+        return self._sample.vector[1]
 
     @property
     def z(self) -> float:
-        with self._lock:
-            return self._vector[2]
+        return self._sample.vector[2]
 
     def wait(self) -> bool:
         return self._ready.wait()
 
+    def wait_until(self, clock: float, timeout: float | None = None) -> bool:
+        """Wait for a sample taken at or after the simulation time `clock`."""
+
+        with self._updated:
+            return self._updated.wait_for(lambda: self._sample.clock >= clock, timeout)
+
 
 @dataclass()
 class PoseHandler:
+    """Handler for world pose messages that keeps the pose of the rover named `name`.
+
+    Like the `MagnetometerHandler`, the pose is published as an immutable sample by swapping a
+    single reference and recorded in `history`. Positions are reported relative to `origin`, the
+    position in the world where the rover was created.
+    """
+
     name: str = field()
-    _lock: Lock = field(default_factory=Lock, init=False)
-    _heading: float = field(default=0.0, init=False)
-    _roll: float = field(default=0.0, init=False)
-    _position: tuple[float, float, float] = field(default=(0.0, 0.0, 0.0), init=False)
-    _clock: float = field(default=0.0, init=False)
+    origin: tuple[float, float, float] = field(default=(0.0, 0.0, 0.0))
+    history: SampleBuffer = field(default_factory=lambda: SampleBuffer(7), init=False)
+    _sample: PoseSample = field(default=PoseSample(0.0, (0.0, 0.0, 0.0)), init=False)
+    _index: int = field(default=0, init=False)
+    _id: int | None = field(default=None, init=False)
     _logger: Logger = field(default_factory=_pose_logger, init=False)
     _ready: Event = field(default_factory=Event, init=False)
+    _updated: Condition = field(default_factory=Condition, init=False)
+    _messages: int = field(default=0, init=False)
+    _first: float = field(default=0.0, init=False)
+    _listeners: list[Callable[[], None]] = field(default_factory=list, init=False)
 
-    def __call__(self, msg: Pose_V):
-        for pose in msg.pose:
+    def _find(self, msg: Pose_V) -> Pose | None:
+        # The world publishes the poses of its entities in a stable order, so the position of the
+        # rover in the message is cached and checked using its entity id before scanning.
+        poses = msg.pose
+
+        if self._index < len(poses):
+            pose = poses[self._index]
+
+            if pose.id == self._id:
+                return pose
+
+        for index, pose in enumerate(poses):
             if pose.name == self.name:
-                self._logger.debug(f"Received pose: {pose}")
+                self._index = index
+                self._id = pose.id
+                self._logger.debug(f"Resolved rover {self.name} to entity {pose.id} at index {index}")
+
+                return pose
+
+        return None
+
+    def __call__(self, msg: Pose_V):
+        pose = self._find(msg)
+
+        if pose is not None:
+            stamp = msg.header.stamp
+            self.update(stamp.sec + stamp.nsec / 1e9, pose)
+
+    def update(self, clock: float, pose: Pose):
+        if self._logger.isEnabledFor(DEBUG):
+            self._logger.debug(f"Received pose: {pose}")
+
+        position = pose.position
+        orientation = pose.orientation
+        x0, y0, z0 = self.origin
+        received = monotonic()
+        sample = PoseSample(
+            clock=clock,
+            position=(position.x - x0, position.y - y0, position.z - z0),
+            orientation=(orientation.w, orientation.x, orientation.y, orientation.z),
+            received=received,
+        )
+        self.history.append(clock, sample.position + sample.orientation, received)
+        self._sample = sample
 
-                time = msg.header.stamp.sec + msg.header.stamp.nsec / 1e9
-                q = Quaterniond(
-                    pose.orientation.w,
-                    pose.orientation.x,
-                    pose.orientation.y,
-                    pose.orientation.z,
-                )
+        if not self._messages:
+            self._first = received
 
-                with self._lock:
-                    euler = q.euler()
-                    self._heading = euler.z()
-                    self._roll = euler.y()
-                    self._position = (pose.position.x, pose.position.y, pose.position.z)
-                    self._clock = time
+        self._messages += 1
 
-                break
+        with self._updated:
+            self._updated.notify_all()
 
         if not self._ready.is_set():
             self._ready.set()
 
+        for listener in self._listeners:
+            listener()
+
+    @property
+    def sample(self) -> PoseSample:
+        return self._sample
+
+    def at(self, clock: float) -> PoseSample:
+        """Return the pose at the simulation time `clock`, interpolating the orientation with slerp."""
+
+        clock, values = self.history.at(clock, "slerp")
+        x, y, z, qw, qx, qy, qz = values.tolist()
+
+        return PoseSample(clock, (x, y, z), (qw, qx, qy, qz), self._sample.received)
+
+    def listen(self, listener: Callable[[], None]) -> Callable[[], None]:
+        """Call `listener` on the transport thread after each message until the returned function is called."""
+
+        return _listen(self, listener)
+
+    @property
+    def delivered_rate(self) -> float:
+        """Average number of messages received per second of wall-clock time."""
+
+        return _rate(self._messages, self._first, self._sample.received)
+
     @property
     def clock(self) -> float:
-        with self._lock:
-            return self._clock
+        return self._sample.clock
 
     @property
     def heading(self) -> float:
-        with self._lock:
-            return self._heading * (180 / pi)
+        return self._sample.heading
 
     @property
     def roll(self) -> float:
-        with self._lock:
-            return self._roll
+        return self._sample.roll
 
     @property
     def position(self) -> tuple[float, float, float]:
-        with self._lock:
-            return self._position
+        return self._sample.position
 
     def wait(self):
         self._ready.wait()
 
+    def wait_until(self, clock: float, timeout: float | None = None) -> bool:
+        """Wait for a pose published at or after the simulation time `clock`."""
+
+        with self._updated:
+            return self._updated.wait_for(lambda: self._sample.clock >= clock, timeout)
+
+
+@dataclass()
+class PoseDemultiplexer:
+    """Handler for world pose messages that updates the pose handlers of several rovers.
+
+    Each message is scanned once, passing the pose of every entity to the handler with the same
+    name, instead of every handler scanning the message for its own rover.
+    """
+
+    handlers: dict[str, PoseHandler] = field()
+
+    def __call__(self, msg: Pose_V):
+        stamp = msg.header.stamp
+        clock = stamp.sec + stamp.nsec / 1e9
+        handlers = self.handlers
+
+        for pose in msg.pose:
+            handler = handlers.get(pose.name)
+
+            if handler is not None:
+                handler.update(clock, pose)
+
 
 def _rover_logger() -> Logger:
     logger = getLogger("rover")
@@ -133,12 +295,124 @@ def _rover_logger() -> Logger:
 InitializedNode = NewType("InitializedNode", Node)
 
 
+class ActuatorBus:
+    """Publishes actuator commands from a dedicated thread.
+
+    Commands are staged on a channel with `send` and handed to the publisher thread together by
+    `flush`, which is called once per control tick. A command replaces any command on the same
+    channel that has not been published yet, and each replaced command is counted in `dropped`.
+    Messages are only built on the publisher thread, so superseded commands cost nothing to
+    encode. `latency` records the time from the flush of a command until it is published.
+
+    The publisher thread runs until `close` is called.
+    """
+
+    def __init__(self, name: str = "actuators"):
+        self.latency = Histogram()
+        self.published = 0
+        self.dropped = 0
+        self._staged: dict[str, tuple[Publisher, Callable[[Any], Any], Any]] = {}
+        self._queued: dict[str, tuple[Publisher, Callable[[Any], Any], Any, float]] = {}
+        self._busy = False
+        self._closed = False
+        self._changed = Condition()
+        self._thread = Thread(target=self._publish, name=name, daemon=True)
+        self._thread.start()
+
+    def send(self, channel: str, publisher: Publisher, encode: Callable[[Any], Any], value: Any):
+        if channel in self._staged:
+            self.dropped += 1
+
+        self._staged[channel] = (publisher, encode, value)
+
+    def flush(self):
+        if not self._staged:
+            return
+
+        now = monotonic()
+
+        with self._changed:
+            for channel, (publisher, encode, value) in self._staged.items():
+                if channel in self._queued:
+                    self.dropped += 1
+
+                self._queued[channel] = (publisher, encode, value, now)
+
+            self._changed.notify_all()
+
+        self._staged.clear()
+
+    def drain(self, timeout: float | None = None) -> bool:
+        """Wait until every flushed command has been published."""
+
+        with self._changed:
+            return self._changed.wait_for(lambda: not self._queued and not self._busy, timeout)
+
+    def reset(self):
+        """Clear the latency and counters, for example at the start of a run."""
+
+        with self._changed:
+            self.latency = Histogram()
+            self.published = 0
+            self.dropped = 0
+
+    def close(self, timeout: float | None = None):
+        """Publish the flushed commands and stop the publisher thread."""
+
+        with self._changed:
+            self._closed = True
+            self._changed.notify_all()
+
+        self._thread.join(timeout)
+
+    def _publish(self):
+        while True:
+            # The histogram is taken with the batch so that a reset during publishing does not
+            # mix the commands of the previous run into the statistics of the next one.
+            with self._changed:
+                self._changed.wait_for(lambda: bool(self._queued) or self._closed)
+
+                if not self._queued:
+                    return
+
+                batch = self._queued
+                latency = self.latency
+                self._queued = {}
+                self._busy = True
+
+            for publisher, encode, value, flushed in batch.values():
+                publisher.publish(encode(value))
+                latency.add(monotonic() - flushed)
+
+            with self._changed:
+                if latency is self.latency:
+                    self.published += len(batch)
+
+                self._busy = False
+                self._changed.notify_all()
+
+
+def _wheel_velocities(velocities: tuple[float, ...]) -> Actuators:
+    msg = Actuators()
+    msg.velocity.extend(velocities)
+
+    return msg
+
+
+def _servo_angle(angle: float) -> Double:
+    msg = Double()
+    msg.data = angle
+
+    return msg
+
+
 @dataclass()
 class Rover(automaton.Model):
     _node: InitializedNode = field()
     _motors: Publisher = field()
     _pose: PoseHandler = field()
     _logger: Logger = field(default_factory=_rover_logger, init=False)
+    bus: ActuatorBus = field(default_factory=ActuatorBus, init=False)
 
     @property
     def clock(self) -> float:
@@ -156,12 +430,43 @@ class Rover(automaton.Model):
     def roll(self) -> float:
         return self._pose.roll
 
+    @property
+    def sample_rates(self) -> dict[str, float]:
+        """Delivered rate of each sensor subscription in messages per second."""
+
+        return {"pose": self._pose.delivered_rate}
+
+    def snapshot(self, clock: float | None = None) -> Snapshot:
+        """Read all sensor values of the rover from the same set of messages.
+
+        If `clock` is given, the values are interpolated at that simulation time instead.
+        """
+
+        pose = self._pose.sample if clock is None else self._pose.at(clock)
+        return Snapshot(pose.clock, pose.position, pose.heading, pose.heading, pose.roll, pose.received)
+
     def wait(self):
         self._pose.wait()
 
+    def listen(self, listener: Callable[[], None]) -> Callable[[], None]:
+        """Call `listener` after every sensor message until the returned function is called."""
+
+        return self._pose.listen(listener)
+
+    def flush(self):
+        """Send the actuator commands set since the last flush."""
+
+        self.bus.flush()
+
 
 @dataclass()
 class R1(Rover):
+    """A differential drive rover.
+
+    The R1 is not driven by the control loop, so its setters publish each command immediately
+    instead of waiting for `flush` like the setters of the `NGC`.
+    """
+
     _velocity: float | None = field(default=None, init=False)
     _omega: float | None = field(default=None, init=False)
 
@@ -172,11 +477,8 @@ class R1(Rover):
     @omega.setter
     def omega(self, target: float):
         if self._omega is None or target != self._omega:
-            msg = Actuators()
-            msg.velocity.append(target)
-            msg.velocity.append(target)
-
-            self._motors.publish(msg)
+            self.bus.send("motors", self._motors, _wheel_velocities, (target, target))
+            self.bus.flush()
             self._omega = target
             self._velocity = None
             self._logger.info(f"Setting angular velocity to {target}")
@@ -188,38 +490,41 @@ class R1(Rover):
     @velocity.setter
     def velocity(self, target: float):
         if self._velocity is None or target != self._velocity:
-            msg = Actuators()
-            msg.velocity.append(-target)
-            msg.velocity.append(target)
-
-            self._motors.publish(msg)
+            self.bus.send("motors", self._motors, _wheel_velocities, (-target, target))
+            self.bus.flush()
             self._velocity = target
             self._omega = None
             self._logger.info(f"Setting velocity to {target}")
 
 
+def _compass_heading(vector: tuple[float, float, float]) -> float:
+    x, y, _ = vector
+
+    if y > 0:
+        heading_ = 90 - (atan(x/y) * 180/pi)
+    elif y < 0:
+        heading_ = 270 - (atan(x/y) * 180/pi)
+    elif x > 0:
+        heading_ = 180.0
+    else:
+        heading_ = 0.0
+
+    return heading_
+
+
 @dataclass()
 class NGC(Rover):
     _magnet: attacks.Magnet = field()
     _magnetometer: MagnetometerHandler = field()
     _servos: Publisher = field()
+    _world: str = field()
     _velocity: float = field(default=0.0, init=False)
     _steering_angle: float  = field(default=0.0, init=False)
+    _origin: PoseSample | None = field(default=None, init=False)
 
     @property
     def _heading(self) -> float:
-        x, y, _ = self._magnetometer.vector
-
-        if y > 0:
-            heading_ = 90 - (atan(x/y) * 180/pi)
-        elif y < 0:
-            heading_ = 270 - (atan(x/y) * 180/pi)
-        elif x > 0:
-            heading_ = 180.0
-        else:
-            heading_ = 0.0
-
-        return heading_
+        return _compass_heading(self._magnetometer.vector)
 
     @property
     def heading_real(self) -> float:
@@ -229,6 +534,31 @@ class NGC(Rover):
     def heading(self) -> float:
         return self._heading + self._magnet.offset(self.clock, self)
 
+    @property
+    def sample_rates(self) -> dict[str, float]:
+        return {"pose": self._pose.delivered_rate, "magnetometer": self._magnetometer.delivered_rate}
+
+    def snapshot(self, clock: float | None = None) -> Snapshot:
+        if clock is None:
+            pose = self._pose.sample
+            magnetometer = self._magnetometer.sample
+        else:
+            pose = self._pose.at(clock)
+            magnetometer = self._magnetometer.at(clock)
+
+        heading = _compass_heading(magnetometer.vector)
+        offset = self._magnet.offset(pose.clock, pose)
+
+        return Snapshot(
+            pose.clock,
+            pose.position,
+            heading + offset,
+            heading,
+            pose.roll,
+            pose.received,
+            magnetometer.received,
+        )
+
     @property
     def steering_angle(self) -> float:
         return self._steering_angle
@@ -239,12 +569,12 @@ class NGC(Rover):
             raise ValueError("Steering angle must be within interval [-0.5, 0.5]")
 
         if target != self._steering_angle:
-            msg = Double()
-            msg.data = target
+            self._send_steering_angle(target)
 
-            self._servos.publish(msg)
-            self._steering_angle = target
-            self._logger.info(f"Setting steering angle to {target}")
+    def _send_steering_angle(self, target: float):
+        self.bus.send("servo", self._servos, _servo_angle, target)
+        self._steering_angle = target
+        self._logger.info(f"Setting steering angle to {target}")
 
     @property
     def velocity(self) -> float:
@@ -253,17 +583,83 @@ class NGC(Rover):
     @velocity.setter
     def velocity(self, target: float):
         if target != self._velocity:
-            msg = Actuators()
-            msg.velocity.append(target)
+            self._send_velocity(target)
 
-            self._motors.publish(msg)
-            self._velocity = target
-            self._logger.info(f"Setting velocity to {target}")
+    def _send_velocity(self, target: float):
+        self.bus.send("motors", self._motors, _wheel_velocities, (target,))
+        self._velocity = target
+        self._logger.info(f"Setting velocity to {target}")
 
     def wait(self):
         self._pose.wait()
         self._magnetometer.wait()
 
+        if self._origin is None:
+            self._origin = self._pose.sample
+
+    def listen(self, listener: Callable[[], None]) -> Callable[[], None]:
+        removers = [self._pose.listen(listener), self._magnetometer.listen(listener)]
+
+        def remove():
+            for remover in removers:
+                remover()
+
+        return remove
+
+    def reset(self, magnet: attacks.Magnet, timeout: float | None = 5.0):
+        """Stop the rover, move it back to its initial pose and replace its magnet.
+
+        The wheel and steering commands are zeroed before the pose is set, so the joint controllers
+        stop the joints on the next step instead of the rover being polled until it comes to rest.
+        The node, handlers and publishers of the rover are kept, so the rover can be reused for
+        another run without creating a new model. Returns once the first pose and magnetometer
+        samples published after the reset have been received.
+        """
+
+        if self._origin is None:
+            raise RoverError("Cannot reset a rover that has not received its initial pose")
+
+        # The commands are always published since the previous run may have been interrupted
+        # before the vehicle stopped.
+        self._send_velocity(0.0)
+        self._send_steering_angle(0.0)
+        self.bus.flush()
+
+        if not self.bus.drain(timeout):
+            raise RoverError("Timed out waiting for the actuator commands to be published")
+
+        msg = Pose()
+        msg.name = self._pose.name
+        msg.position.x, msg.position.y, msg.position.z = (
+            p + o for p, o in zip(self._origin.position, self._pose.origin)
+        )
+        msg.orientation.w, msg.orientation.x, msg.orientation.y, msg.orientation.z = self._origin.orientation
+        res, rep = self._node.request(f"/world/{self._world}/set_pose", msg, Pose, Boolean, timeout=5000)
+
+        if not res:
+            raise TransportError("Failed to send Gazebo message for rover pose")
+
+        if not rep.data:
+            raise RoverError(f"Could not set pose of rover {self._pose.name}")
+
+        self._magnet = magnet
+        self._logger.info(f"Reset rover {self._pose.name} with magnet {magnet}")
+
+        if not self.wait_until(nextafter(self._pose.clock, inf), timeout):
+            raise RoverError("Timed out waiting for sensor messages after reset")
+
+    def wait_until(self, clock: float, timeout: float | None = None) -> bool:
+        """Wait for pose and magnetometer samples from the simulation time `clock`.
+
+        The magnetometer only publishes every 1/MAGNETOMETER_RATE seconds of simulation time, so
+        the latest magnetometer sample may be up to one period older than `clock`.
+        """
+
+        if not self._pose.wait_until(clock, timeout):
+            return False
+
+        return self._magnetometer.wait_until(clock - 1 / MAGNETOMETER_RATE, timeout)
+
 
 class RoverError(Exception):
     pass
@@ -273,18 +669,88 @@ class TransportError(RoverError):
     pass
 
 
+MAGNETOMETER_RATE: int = 250
+"""Update rate of the ngc_rover magnetometer sensor in Hz."""
+
+
+@dataclass(frozen=True)
+class SampleRate:
+    """Rate of the sensor subscriptions of a rover, derived from the control frequency.
+
+    Subscriptions deliver `per_tick` messages for every control step, up to `maximum` messages per
+    second, since the sensors do not publish faster than that. If `per_tick` is None every message
+    is delivered, which is required when the last message of each step must not be dropped.
+    """
+
+    per_tick: float | None = field(default=2)
+    maximum: int = field(default=MAGNETOMETER_RATE)
+
+    def msgs_per_sec(self, frequency: float) -> int | None:
+        if self.per_tick is None:
+            return None
+
+        return min(ceil(self.per_tick * frequency), self.maximum)
+
+
+UNTHROTTLED: SampleRate = SampleRate(per_tick=None)
+
+
+@dataclass()
+class World:
+    """Control of the simulation time of a Gazebo world."""
+
+    _node: Node = field()
+    name: str = field()
+    _logger: Logger = field(default_factory=_rover_logger, init=False)
+
+    def _control(self, msg: WorldControl):
+        res, rep = self._node.request(f"/world/{self.name}/control", msg, WorldControl, Boolean, timeout=5000)
+
+        if not res:
+            raise TransportError("Failed to send Gazebo message for world control")
+
+        if not rep.data:
+            raise RoverError(f"Could not control world {self.name}")
+
+    def pause(self):
+        msg = WorldControl()
+        msg.pause = True
+        self._control(msg)
+        self._logger.info(f"Paused world {self.name}")
+
+    def resume(self):
+        msg = WorldControl()
+        msg.pause = False
+        self._control(msg)
+        self._logger.info(f"Resumed world {self.name}")
+
+    def run_to(self, clock: float):
+        """Run the paused world until its simulation time reaches `clock`, then pause again."""
+
+        msg = WorldControl()
+        msg.pause = True
+        msg.run_to_sim_time.sec = int(clock)
+        msg.run_to_sim_time.nsec = int(round((clock - int(clock)) * 1e9))
+        self._control(msg)
+
+
 def _create_model(
     world: str,
     model: Literal["r1_rover", "ngc_rover"],
     *,
     name: str,
     logger: Logger,
+    position: tuple[float, float, float] | None = None,
 ) -> InitializedNode:
     client = Node()
     msg = EntityFactory()
     msg.sdf_filename = f"{model}/model.sdf"
     msg.name = name
     msg.allow_renaming = False
+
+    if position is not None:
+        msg.pose.position.x, msg.pose.position.y, msg.pose.position.z = position
+
     res, rep = client.request(f"/world/{world}/create", msg, EntityFactory, Boolean, timeout=5000)
 
     logger.debug(f"Response: {res}")
@@ -304,10 +770,14 @@ def _pose_handler(
     world: str,
     *,
     name:str,
+    msgs_per_sec: int | None = 10,
+    origin: tuple[float, float, float] = (0.0, 0.0, 0.0),
 ) -> PoseHandler:
-    pose = PoseHandler(name)
+    pose = PoseHandler(name, origin)
     pose_options = SubscribeOptions()
-    pose_options.msgs_per_sec = 10
+
+    if msgs_per_sec is not None:
+        pose_options.msgs_per_sec = msgs_per_sec
 
     if not node.subscribe(Pose_V, f"/world/{world}/pose/info", pose, pose_options):
         raise TransportError()
@@ -319,11 +789,14 @@ def _magnetometer_handler(
     world: str,
     *,
     name:str,
+    msgs_per_sec: int | None = 10,
 ) -> MagnetometerHandler:
     topic = f"/world/{world}/model/{name}/link/base_link/sensor/magnetometer_sensor/magnetometer"
     magnetometer = MagnetometerHandler()
     magnetometer_options = SubscribeOptions()
-    magnetometer_options.msgs_per_sec = 10
+
+    if msgs_per_sec is not None:
+        magnetometer_options.msgs_per_sec = msgs_per_sec
 
     if not node.subscribe(Magnetometer, topic, magnetometer, magnetometer_options):
         raise TransportError()
@@ -331,15 +804,18 @@ def _magnetometer_handler(
     return magnetometer
 
 
-def r1(world: str, *, name: str = "r1_rover") -> R1:
+def r1(world: str, *, name: str = "r1_rover", frequency: float = 5.0, rate: SampleRate = SampleRate()) -> R1:
+    """Create an r1_rover in the world, subscribing to its sensors at `rate` for `frequency`."""
+
     logger = getLogger("rover.r1")
     logger.addHandler(NullHandler())
 
     node = _create_model(world, name=name, model="r1_rover", logger=logger)
     logger.info(f"Created rover model {name} in gazebo world {world}.")
 
-    pose = _pose_handler(node, world, name=name)
-    logger.info("Initialized pose topic handler.")
+    msgs_per_sec = rate.msgs_per_sec(frequency)
+    pose = _pose_handler(node, world, name=name, msgs_per_sec=msgs_per_sec)
+    logger.info(f"Initialized pose topic handler at {msgs_per_sec or 'all'} msgs/sec.")
 
     motors = node.advertise(f"/model/{name}/command/motor_speed", Actuators)
 
@@ -351,18 +827,22 @@ def r1(world: str, *, name: str = "r1_rover") -> R1:
     return R1(node, motors, pose)
 
 
-def ngc(world: str, *, magnet: attacks.Magnet, name: str = "ackermann") -> NGC:
-    logger = getLogger("rover.ackermann")
-    logger.addHandler(NullHandler())
-
-    node = _create_model(world, name=name, model="ngc_rover", logger=logger)
-    logger.info(f"Created rover model {name} in gazebo world {world}.")
+def world(name: str) -> World:
+    return World(Node(), name)
 
-    pose = _pose_handler(node, world, name=name)
-    logger.info("Initialized pose topic handler")
 
-    magnetometer = _magnetometer_handler(node, world, name=name)
-    logger.info("Initialized magnetometer topic handler")
+def _ngc(
+    node: InitializedNode,
+    world: str,
+    pose: PoseHandler,
+    *,
+    magnet: attacks.Magnet,
+    msgs_per_sec: int | None,
+    logger: Logger,
+) -> NGC:
+    name = pose.name
+    magnetometer = _magnetometer_handler(node, world, name=name, msgs_per_sec=msgs_per_sec)
+    logger.info(f"Initialized magnetometer topic handler at {msgs_per_sec or 'all'} msgs/sec")
 
     motors = node.advertise(f"/model/{name}/command/motor_speed", Actuators)
 
@@ -377,4 +857,87 @@ def ngc(world: str, *, magnet: attacks.Magnet, name: str = "ackermann") -> NGC:
 
     logger.info("Initialized servo topic publisher.")
 
-    return NGC(node, motors, pose, magnet, magnetometer, servos)
+    return NGC(node, motors, pose, magnet, magnetometer, servos, world)
+
+
+def ngc(
+    world: str,
+    *,
+    magnet: attacks.Magnet,
+    name: str = "ackermann",
+    frequency: float = 5.0,
+    rate: SampleRate = SampleRate(),
+    origin: tuple[float, float, float] | None = None,
+) -> NGC:
+    """Create an ngc_rover in the world.
+
+    Sensor messages are throttled to the rate given by `rate` for a controller running at
+    `frequency` steps per second. If `origin` is given the rover is created at that position and
+    reports its position relative to it, as in `ngc_fleet`.
+    """
+
+    logger = getLogger("rover.ackermann")
+    logger.addHandler(NullHandler())
+
+    position = (origin[0], origin[1], NGC_HEIGHT) if origin is not None else None
+    node = _create_model(world, name=name, model="ngc_rover", logger=logger, position=position)
+    logger.info(f"Created rover model {name} in gazebo world {world}.")
+
+    msgs_per_sec = rate.msgs_per_sec(frequency)
+    pose = _pose_handler(node, world, name=name, msgs_per_sec=msgs_per_sec, origin=origin or (0.0, 0.0, 0.0))
+    logger.info(f"Initialized pose topic handler at {msgs_per_sec or 'all'} msgs/sec")
+
+    return _ngc(node, world, pose, magnet=magnet, msgs_per_sec=msgs_per_sec, logger=logger)
+
+
+NGC_HEIGHT: float = 0.04
+"""Height of the ngc_rover model above the ground when it is created."""
+
+
+def ngc_fleet(
+    world: str,
+    *,
+    magnets: list[attacks.Magnet],
+    prefix: str = "ackermann",
+    spacing: float = 50.0,
+    frequency: float = 5.0,
+    rate: SampleRate = SampleRate(),
+) -> list[NGC]:
+    """Create an ngc_rover in the world for every magnet.
+
+    The rovers are named `prefix` followed by their index and are created `spacing` meters apart
+    along the y axis so that they do not collide. Each rover reports its position relative to
+    where it was created, and the poses of all rovers are read from a single subscription.
+    """
+
+    logger = getLogger("rover.ackermann")
+    logger.addHandler(NullHandler())
+
+    handlers: dict[str, PoseHandler] = {}
+    nodes: list[InitializedNode] = []
+    msgs_per_sec = rate.msgs_per_sec(frequency)
+
+    for index in range(len(magnets)):
+        name = f"{prefix}_{index}"
+        origin = (0.0, index * spacing, 0.0)
+        position = (origin[0], origin[1], NGC_HEIGHT)
+        nodes.append(_create_model(world, name=name, model="ngc_rover", logger=logger, position=position))
+        handlers[name] = PoseHandler(name, origin)
+        logger.info(f"Created rover model {name} in gazebo world {world}.")
+
+    if nodes:
+        demux = PoseDemultiplexer(handlers)
+        options = SubscribeOptions()
+
+        if msgs_per_sec is not None:
+            options.msgs_per_sec = msgs_per_sec
+
+        if not nodes[0].subscribe(Pose_V, f"/world/{world}/pose/info", demux, options):
+            raise TransportError()
+
+        logger.info(f"Initialized pose topic handler for {len(handlers)} rovers at {msgs_per_sec or 'all'} msgs/sec")
+
+    return [
+        _ngc(node, world, pose, magnet=magnet, msgs_per_sec=msgs_per_sec, logger=logger)
+        for node, pose, magnet in zip(nodes, handlers.values(), magnets)
+    ]
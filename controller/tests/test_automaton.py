@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+import pytest
+
+import controller.automaton as ha
+
+STEP_SIZE = 0.1
+STEPS = 300
+LANES = 64
+
+
+@dataclass()
+class Pose:
+    position: ha.Position
+    heading: float
+
+
+def _sequence(rng: np.random.Generator) -> tuple[list[Pose], list[ha.Command | None]]:
+    # Positions are a random walk with steps large enough to cross the distance guards, and
+    # headings are drawn uniformly so that the heading guard is crossed in both directions.
+    positions = np.cumsum(rng.normal(0.0, 0.8, size=(STEPS, 3)), axis=0)
+    headings = rng.uniform(0.0, 360.0, size=STEPS)
+    choices = rng.choice(3, size=STEPS, p=[0.9, 0.07, 0.03])
+    poses = [Pose((float(x), float(y), float(z)), float(h)) for (x, y, z), h in zip(positions, headings)]
+    commands: list[ha.Command | None] = [(None, 55, 66)[c] for c in choices]
+
+    return poses, commands
+
+
+def _history(automaton: ha.Automaton | ha.CompiledAutomaton, poses: list[Pose], commands: list[ha.Command | None]):
+    """States and actions before every step, and the index of the step that failed if any."""
+
+    history: list[tuple[ha.State, ha.Action]] = []
+
+    for index, (pose, cmd) in enumerate(zip(poses, commands)):
+        history.append((automaton.state, automaton.action))
+
+        try:
+            automaton.step(cmd, pose)
+        except AssertionError:
+            return history, index
+
+    history.append((automaton.state, automaton.action))
+    return history, None
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_compiled_matches_scalar(seed: int):
+    rng = np.random.default_rng(seed)
+
+    for _ in range(LANES):
+        poses, commands = _sequence(rng)
+        expected = _history(ha.Automaton(poses[0], STEP_SIZE), poses, commands)
+        actual = _history(ha.CompiledAutomaton(poses[0], STEP_SIZE), poses, commands)
+
+        assert actual == expected
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_batch_matches_scalar(seed: int):
+    rng = np.random.default_rng(seed)
+    sequences = [_sequence(rng) for _ in range(LANES)]
+    expected = [_history(ha.Automaton(poses[0], STEP_SIZE), poses, commands) for poses, commands in sequences]
+    failures = [failure for _, failure in expected if failure is not None]
+    failure = min(failures) if failures else None
+
+    positions = np.array([[pose.position for pose in poses] for poses, _ in sequences])
+    headings = np.array([[pose.heading for pose in poses] for poses, _ in sequences])
+    cmds = np.array([[cmd or 0 for cmd in commands] for _, commands in sequences], dtype=np.uint8)
+    batch = ha.BatchAutomaton(LANES, STEP_SIZE)
+
+    # The batch fails as a whole on the first step where any of its automata fails
+    for step in range(STEPS + 1):
+        for lane, (history, _) in enumerate(expected):
+            state, action = history[step]
+            assert batch.state(lane) == state
+            assert batch.actions[lane] == action
+            assert batch.terminal[lane] == state.is_terminal()
+
+        if step == STEPS:
+            break
+
+        if step == failure:
+            with pytest.raises(AssertionError):
+                batch.step(positions[:, step], headings[:, step], cmds[:, step])
+
+            return
+
+        batch.step(positions[:, step], headings[:, step], cmds[:, step])
+
+    assert failure is None
+
+
+def _s7(automaton: ha.Automaton | ha.CompiledAutomaton | ha.BatchAutomaton, idle: ha.Command | None = None):
+    """Drive an automaton through S1 to S5 and abort into S7, sending `idle` before the abort."""
+
+    start = Pose((0.0, 0.0, 0.0), 100.0)
+    far = Pose((10.0, 0.0, 0.0), 100.0)
+    turned = Pose((10.0, 0.0, 0.0), 20.0)
+    moved = Pose((10.0, 1.0, 0.0), 20.0)
+    steps: list[tuple[Pose, ha.Command | None]] = [(start, idle)] * 51
+    steps += [(start, idle), (far, idle), (turned, idle), (moved, idle), (moved, 66)]
+
+    for pose, cmd in steps:
+        if isinstance(automaton, ha.BatchAutomaton):
+            automaton.step(np.array([pose.position]), np.array([pose.heading]), np.array([cmd or 0], dtype=np.uint8))
+        else:
+            automaton.step(cmd, pose)
+
+
+def test_s7_resume_is_rejected():
+    pose = Pose((10.0, 1.0, 0.0), 20.0)
+    scalar = ha.Automaton(pose, STEP_SIZE)
+    compiled = ha.CompiledAutomaton(pose, STEP_SIZE)
+    batch = ha.BatchAutomaton(1, STEP_SIZE)
+
+    for automaton in (scalar, compiled, batch):
+        _s7(automaton)
+
+    assert isinstance(scalar.state, ha.S7)
+    assert compiled.state == scalar.state
+    assert batch.state(0) == scalar.state
+
+    # Resuming from S7 keeps the move flag, which S9 does not accept
+    with pytest.raises(AssertionError):
+        scalar.step(55, pose)
+
+    with pytest.raises(AssertionError):
+        compiled.step(55, pose)
+
+    with pytest.raises(AssertionError):
+        batch.step(np.array([pose.position]), np.array([pose.heading]), np.array([55], dtype=np.uint8))
+
+
+@pytest.mark.parametrize("cls", [ha.Automaton, ha.CompiledAutomaton])
+def test_transitions_caused_by_commands(cls: type[ha.Automaton] | type[ha.CompiledAutomaton]):
+    # Command 55 is ignored by every state before S7, so it must not be reported as the cause of
+    # the guard transitions taken while it is sent.
+    pose = Pose((10.0, 1.0, 0.0), 20.0)
+    automaton = cls(pose, STEP_SIZE)
+    transitions: list[ha.Transition] = []
+    automaton.subscribe(lambda event: transitions.append(event) if isinstance(event, ha.Transition) else None)
+    _s7(automaton, idle=55)
+
+    assert [type(t.target) for t in transitions] == [ha.S2, ha.S3, ha.S4, ha.S5, ha.S7]
+    assert [t.commanded for t in transitions] == [False, False, False, False, True]
@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+import json
+import math
+import pathlib
+import subprocess
+
+CONTROLLER = pathlib.Path(__file__).parent.parent
+
+
+def test_bench_target(tmp_path: pathlib.Path):
+    output = tmp_path / "benchmarks.json"
+    subprocess.run(["make", "-C", str(CONTROLLER), "bench", f"BENCHMARKS_OUTPUT={output}"], check=True)
+    report = json.loads(output.read_text())
+
+    # Benchmarks that cannot run here, like those needing the gz bindings, are reported as skipped
+    assert set(report["benchmarks"]) == {"automaton", "handlers", "heading", "messages", "simulation"}
+
+    for name in ("automaton", "heading", "messages", "simulation"):
+        results = report["benchmarks"][name]
+
+        assert results and "skipped" not in results
+        assert all(math.isfinite(value) and value > 0 for value in results.values()), name
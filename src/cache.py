@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import itertools
+import json
+import logging
+import os
+import pathlib
+import struct
+import tempfile
+import threading
+import typing
+
+import docker
+import docker.errors
+import numpy as np
+import numpy.random as rand
+
+from controller.messages import Result, Start
+
+DEFAULT_DIRECTORY: typing.Final[pathlib.Path] = pathlib.Path.home() / ".cache" / "ngc-rover-ha" / "results"
+DEFAULT_SIZE: typing.Final[int] = 1024 * 1024 * 1024
+
+
+class UncacheableError(Exception):
+    pass
+
+
+def _canonical(value: object) -> object:
+    if value is None or isinstance(value, (bool, int, str)):
+        return value
+
+    if isinstance(value, float):
+        return float.hex(value)
+
+    if isinstance(value, (list, tuple)):
+        return [_canonical(item) for item in value]
+
+    if isinstance(value, dict):
+        return {str(key): _canonical(item) for key, item in sorted(value.items())}
+
+    if isinstance(value, np.ndarray):
+        return {"type": "ndarray", "dtype": value.dtype.str, "shape": list(value.shape), "data": value.tobytes().hex()}
+
+    if isinstance(value, rand.Generator):
+        # The state of the bit generator identifies the seed and every number drawn before the run
+        return {"type": "Generator", "state": _canonical(value.bit_generator.state)}
+
+    if isinstance(value, itertools.repeat):
+        # The repr of a repeat does not consume it, but includes the remaining count if bounded
+        return {"type": "repeat", "repr": repr(value)}
+
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return {
+            "type": f"{type(value).__module__}.{type(value).__qualname__}",
+            "fields": {f.name: _canonical(getattr(value, f.name)) for f in dataclasses.fields(value) if f.init},
+        }
+
+    raise UncacheableError(f"Cannot canonicalize value of type {type(value).__name__}")
+
+
+def _image_digest(client: docker.DockerClient, image: str) -> str:
+    try:
+        return client.images.get(image).id
+    except docker.errors.ImageNotFound:
+        raise UncacheableError(f"Image {image} is not available locally") from None
+
+
+class Cache:
+    """Content-addressed store of simulation results, bounded in size with LRU eviction.
+
+    Results are keyed by a hash of the canonical form of the `Start` message and the ids of the
+    container images, which include the worlds and models, so any change to the inputs, the magnet
+    random state or the images selects a different entry. Messages that cannot be canonicalized, like arbitrary command iterators,
+    are never cached. Each entry is a file holding the encoded `Result`, and its modification time
+    records its last use.
+    """
+
+    def __init__(
+        self,
+        images: typing.Sequence[str],
+        *,
+        directory: pathlib.Path = DEFAULT_DIRECTORY,
+        max_bytes: int = DEFAULT_SIZE,
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._images = images
+        self._digests: list[str] | None = None
+        self._lock = threading.Lock()
+        self._logger = logging.getLogger("cache")
+
+    def _image_digests(self) -> list[str]:
+        if self._digests is None:
+            client = docker.from_env()
+            self._digests = [_image_digest(client, image) for image in self._images]
+
+        return self._digests
+
+    def key(self, msg: Start) -> str:
+        document = {
+            "start": _canonical(msg),
+            "images": self._image_digests(),
+        }
+        encoded = json.dumps(document, sort_keys=True, separators=(",", ":"))
+
+        return hashlib.sha256(encoded.encode()).hexdigest()
+
+    def _path(self, key: str) -> pathlib.Path:
+        return self.directory / f"{key}.ngcr"
+
+    def get(self, key: str) -> Result | None:
+        path = self._path(key)
+
+        try:
+            data = path.read_bytes()
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+
+        try:
+            return Result.decode(data)
+        except (ValueError, struct.error):
+            # Entries that were truncated or use an unsupported encoding are replaced on the next put
+            self._logger.warning(f"Removing unreadable cached result {key}")
+            path.unlink(missing_ok=True)
+            return None
+
+    def put(self, key: str, result: Result):
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        with tempfile.NamedTemporaryFile(dir=self.directory, suffix=".tmp", delete=False) as f:
+            f.write(result.encode())
+
+        os.replace(f.name, self._path(key))
+        self._evict()
+
+    def _evict(self):
+        with self._lock:
+            entries = []
+
+            for path in self.directory.glob("*.ngcr"):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+            total = sum(size for _, size, _ in entries)
+
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+
+                path.unlink(missing_ok=True)
+                total -= size
+                self._logger.debug(f"Evicted cached result {path.stem}")
+
+    def run(self, msg: Start, simulate: typing.Callable[[], Result]) -> Result:
+        """Return the cached result for `msg`, or call `simulate` and cache its result."""
+
+        try:
+            key = self.key(msg)
+        except UncacheableError as e:
+            self._logger.info(f"Not caching simulation: {e}")
+            return simulate()
+
+        result = self.get(key)
+
+        if result is not None:
+            self._logger.info(f"Using cached result {key}")
+            return result
+
+        result = simulate()
+        self.put(key, result)
+
+        return result
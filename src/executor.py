@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import logging
+import pathlib
+import queue
+import threading
+import time
+import typing
+
+import docker
+import docker.errors
+from docker.models.containers import Container
+
+from controller.messages import Result, Start
+from sessions import SessionExecutor
+
+READY_TIMEOUT: typing.Final[float] = 60.0
+"""Seconds to wait for the world of a slot to accept requests."""
+
+
+class ExecutorClosedError(Exception):
+    pass
+
+
+class SlotError(Exception):
+    pass
+
+
+class Slot:
+    """A Gazebo server and a controller serving simulations in it, kept running between runs.
+
+    The controller shares the network of the Gazebo container and runs its `sessions` command
+    limited to a single session, so the slot runs one simulation at a time and the controller
+    reuses its rover between them. Each run builds its `Start` message with `start` from the
+    keyword arguments of `run`.
+    """
+
+    def __init__(
+        self,
+        gazebo_image: str,
+        firmware_image: str,
+        *,
+        world: str,
+        base: pathlib.Path,
+        port: int,
+        start: typing.Callable[..., Start],
+        verbose: bool = False,
+        timeout: float = READY_TIMEOUT,
+    ):
+        client = docker.from_env()
+        prefix = "controller --verbose" if verbose else "controller"
+        self._containers: list[Container] = []
+        self._logger = logging.getLogger("executor.slot")
+
+        try:
+            gazebo = client.containers.run(
+                gazebo_image,
+                entrypoint=["gz", "sim", "-s", "-r", str(base)],
+                working_dir="/app",
+                environment={"GZ_SIM_RESOURCE_PATH": "/app/resources/models"},
+                ports={f"{port}/tcp": None},
+                detach=True,
+                auto_remove=True,
+            )
+            self._containers.append(gazebo)
+            self._wait_for_world(gazebo, world, timeout)
+            controller = client.containers.run(
+                firmware_image,
+                command=f"{prefix} sessions --port {port} --max-sessions 1",
+                network_mode=f"container:{gazebo.id}",
+                detach=True,
+                auto_remove=True,
+            )
+            self._containers.append(controller)
+            gazebo.reload()
+            host_port = gazebo.ports[f"{port}/tcp"][0]["HostPort"]
+        except BaseException:
+            self.close()
+            raise
+
+        self._logger.info(f"Started slot with Gazebo container {gazebo.short_id} on port {host_port}")
+        self._sessions = SessionExecutor(f"tcp://localhost:{host_port}", start)
+
+    def _wait_for_world(self, gazebo: Container, world: str, timeout: float):
+        service = f"/world/{world}/create"
+        deadline = time.monotonic() + timeout
+
+        while time.monotonic() < deadline:
+            _, output = gazebo.exec_run(["gz", "service", "-l"])
+
+            if service in output.decode(errors="replace"):
+                return
+
+            time.sleep(0.5)
+
+        raise SlotError(f"Timed out waiting for world {world} in container {gazebo.short_id}")
+
+    def run(self, **kwargs: typing.Any) -> Result:
+        return self._sessions.run(**kwargs)
+
+    def close(self):
+        # The controller is stopped before the world it is connected to
+        for container in reversed(self._containers):
+            try:
+                container.stop(timeout=5)
+            except docker.errors.APIError as e:
+                self._logger.warning(f"Could not stop container {container.short_id}: {e}")
+
+        self._containers.clear()
+
+
+class Executor:
+    """Runs simulations from concurrent evaluations, at most `size` at a time.
+
+    The executor starts `size` slots up front, each with its own Gazebo and controller containers
+    which stay up for every run. Callers borrow a free slot for the duration of a run and block
+    while all slots are busy. After any run fails the executor is closed, the containers of the
+    slots are stopped as they become free and pending or later runs raise `ExecutorClosedError`.
+    """
+
+    def __init__(self, size: int, slot: typing.Callable[[], Slot]):
+        if size < 1:
+            raise ValueError("Executor size must be at least 1")
+
+        self.size = size
+        self._slots: queue.Queue[Slot] = queue.Queue()
+        self._closed = threading.Event()
+        self._lock = threading.Lock()
+        self._logger = logging.getLogger("executor")
+
+        try:
+            for _ in range(size):
+                self._slots.put(slot())
+        except BaseException:
+            self.close()
+            raise
+
+    def _acquire(self) -> Slot:
+        while not self._closed.is_set():
+            try:
+                return self._slots.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+        raise ExecutorClosedError()
+
+    def _release(self, slot: Slot):
+        with self._lock:
+            if not self._closed.is_set():
+                self._slots.put(slot)
+                return
+
+        slot.close()
+
+    def run(self, **kwargs: typing.Any) -> Result:
+        """Run a simulation using the first free slot."""
+
+        slot = self._acquire()
+
+        try:
+            return slot.run(**kwargs)
+        except BaseException:
+            self._logger.exception("Simulation failed, closing executor")
+            self.close()
+            raise
+        finally:
+            self._release(slot)
+
+    def close(self):
+        with self._lock:
+            self._closed.set()
+            idle = []
+
+            while not self._slots.empty():
+                idle.append(self._slots.get_nowait())
+
+        for slot in idle:
+            slot.close()
+
+    def __enter__(self) -> Executor:
+        return self
+
+    def __exit__(self, *args: object):
+        self.close()
@@ -1,10 +1,18 @@
 from __future__ import annotations
 
+import concurrent.futures
+import os
+from collections.abc import Mapping, Sequence
 from dataclasses import dataclass
 from typing import Literal
 
+import numpy as np
 from matplotlib import pyplot as plt
 from matplotlib import patches as patches
+from matplotlib.axes import Axes
+from matplotlib.collections import LineCollection
+from matplotlib.figure import Figure
+from numpy.typing import NDArray
 from staliro import Trace
 
 
@@ -15,8 +23,50 @@ class Plot:
     color: Literal["r", "g", "b", "k"] = "k"
 
 
-def plot(*plots: Plot):
-    _, ax = plt.subplots()
+def points(trace: Trace[list[float]]) -> NDArray[np.float64]:
+    """The x and y positions of a trajectory as an array with one row per time."""
+
+    states = np.array(list(trace.states), dtype=np.float64)
+    return states[:, :2] if len(states) else np.empty((0, 2))
+
+
+def decimate(line: NDArray[np.float64], tolerance: float) -> NDArray[np.float64]:
+    """Remove points of a line that are within `tolerance` of the simplified line.
+
+    This is the Ramer-Douglas-Peucker algorithm with the distance measured to the simplifying
+    segment instead of its extension, so no removed point is further than `tolerance` from the
+    returned line.
+    """
+
+    if tolerance <= 0 or len(line) < 3:
+        return line
+
+    keep = np.zeros(len(line), dtype=bool)
+    keep[[0, -1]] = True
+    pending = [(0, len(line) - 1)]
+
+    while pending:
+        first, last = pending.pop()
+
+        if last - first < 2:
+            continue
+
+        segment = line[last] - line[first]
+        offsets = line[first + 1 : last] - line[first]
+        length = segment @ segment
+        t = np.clip(offsets @ segment / length, 0.0, 1.0) if length > 0 else np.zeros(len(offsets))
+        distances = np.hypot(*(offsets - t[:, np.newaxis] * segment).T)
+        index = int(np.argmax(distances))
+
+        if distances[index] > tolerance:
+            split = first + 1 + index
+            keep[split] = True
+            pending.extend(((first, split), (split, last)))
+
+    return line[keep]
+
+
+def _draw(ax: Axes, plots: Sequence[Plot], tolerance: float):
     ax.set_title("Trajectory")
     # ax.set_xlim(left=0, right=16)
     ax.set_ylim(bottom=-2, top=10)
@@ -31,14 +81,51 @@ def plot(*plots: Plot):
             c="b",
         )
 
-    for plot in plots:
-        # ax.add_patch(patches.Circle(plot.magnet, 0.1, linewidth=1, edgecolor="b"))
+    # Every trajectory is drawn by a single collection, which is much faster than a line per plot
+    lines = [decimate(points(plot.trajectory), tolerance) for plot in plots]
+    ax.add_collection(LineCollection(lines, colors=[plot.color for plot in plots]))
+    ax.autoscale_view(scaley=False)
 
-        times = list(plot.trajectory.times)
-        ax.plot(
-            [plot.trajectory[time][0] for time in times],
-            [plot.trajectory[time][1] for time in times],
-            plot.color,
-        )
 
+def plot(*plots: Plot, output: str | os.PathLike[str] | None = None, tolerance: float = 0.0):
+    """Draw the trajectories of the plots, decimated to within `tolerance` meters.
+
+    The figure is shown in a window unless `output` is given, in which case it is written to that
+    file in the format given by its extension, like PNG or SVG, without needing a display.
+    """
+
+    if output is not None:
+        _save(plots, output, tolerance)
+        return
+
+    _, ax = plt.subplots()
+    _draw(ax, plots, tolerance)
     plt.show(block=True)
+
+
+def _save(plots: Sequence[Plot], output: str | os.PathLike[str], tolerance: float):
+    # The figure is not created with pyplot so that no interactive backend is required
+    figure = Figure()
+    _draw(figure.subplots(), plots, tolerance)
+    figure.savefig(output)
+
+
+def render(
+    figures: Mapping[str | os.PathLike[str], Sequence[Plot]],
+    *,
+    tolerance: float = 0.0,
+    workers: int | None = None,
+):
+    """Write a figure to each output path, rendering them in `workers` processes if given."""
+
+    if workers is None or workers < 2:
+        for output, plots in figures.items():
+            _save(plots, output, tolerance)
+
+        return
+
+    with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+        futures = [executor.submit(_save, plots, output, tolerance) for output, plots in figures.items()]
+
+        for future in futures:
+            future.result()
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import pickle
+import typing
+
+import zmq
+
+from controller.messages import Failure, Result, Start
+
+
+class SessionError(Exception):
+    pass
+
+
+class SessionExecutor:
+    """Runs simulations as concurrent sessions of a controller started with its `sessions` command.
+
+    Unlike the `Executor`, the Gazebo and controller containers are started outside of the harness
+    and every run shares them. Each run builds its `Start` message with `start` from the keyword
+    arguments of `run` and uses its own socket, so runs may be started from several threads at once
+    and the controller runs them concurrently.
+    """
+
+    def __init__(self, address: str, start: typing.Callable[..., Start]):
+        self.address = address
+        self._start = start
+        self._context = zmq.Context.instance()
+
+    def run(self, **kwargs: typing.Any) -> Result:
+        socket = self._context.socket(zmq.DEALER)
+
+        try:
+            socket.connect(self.address)
+            socket.send(pickle.dumps(self._start(**kwargs)))
+            reply = pickle.loads(socket.recv())
+        finally:
+            socket.close(linger=0)
+
+        if isinstance(reply, Failure):
+            raise SessionError(reply.reason)
+
+        if not isinstance(reply, Result):
+            raise SessionError(f"Unexpected message {type(reply).__name__}")
+
+        return reply
+
+    def close(self):
+        pass
+
+    def __enter__(self) -> SessionExecutor:
+        return self
+
+    def __exit__(self, *args: object):
+        self.close()
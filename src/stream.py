@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import pickle
+from collections.abc import Iterator
+
+import zmq
+
+from controller.messages import Cancel, Failure, Progress, Result, Start, Step, Stream
+
+
+class StreamError(Exception):
+    pass
+
+
+class StreamedRun:
+    """Client of the controller `stream` command.
+
+    Iterating over the run yields each step as soon as the controller sends it. Calling `cancel`
+    asks the controller to stop the simulation, after which iteration ends once the controller
+    replies with the partial result. The final result is available from `result`.
+    """
+
+    def __init__(self, address: str, start: Start, *, batch: int = 10):
+        self._context = zmq.Context.instance()
+        self._socket = self._context.socket(zmq.DEALER)
+        self._socket.connect(address)
+        self._socket.send(pickle.dumps(Stream(start, batch)))
+        self.result: Result | None = None
+
+    def __iter__(self) -> Iterator[Step]:
+        while self.result is None:
+            msg = pickle.loads(self._socket.recv())
+
+            if isinstance(msg, Progress):
+                yield from msg.steps
+            elif isinstance(msg, Result):
+                self.result = msg
+            elif isinstance(msg, Failure):
+                raise StreamError(msg.reason)
+            else:
+                raise StreamError(f"Unexpected message {type(msg).__name__}")
+
+    def cancel(self):
+        self._socket.send(pickle.dumps(Cancel()))
+
+    def close(self):
+        self._socket.close(linger=0)
+
+    def __enter__(self) -> StreamedRun:
+        return self
+
+    def __exit__(self, *args: object):
+        self.close()
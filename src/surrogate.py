@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import dataclasses
+import logging
+import threading
+import typing
+
+import numpy as np
+from numpy.typing import NDArray
+from scipy.spatial import cKDTree
+
+from controller.messages import Result
+
+Source: typing.TypeAlias = typing.Literal["surrogate", "simulation"]
+
+COLUMNS: typing.Final[tuple[str, ...]] = ("x", "y", "z", "heading", "roll")
+"""Columns of the trajectory of an answer."""
+
+
+@dataclasses.dataclass(frozen=True)
+class Answer:
+    """Trajectory and robustness of a sample, labelled with how they were obtained.
+
+    The trajectory has one row per time and one column per name in `COLUMNS`. For a surrogate
+    estimate `distance` is the normalized distance to the nearest evaluated sample, and for a
+    simulation it is zero.
+    """
+
+    time: NDArray[np.float64]
+    trajectory: NDArray[np.float64]
+    robustness: float | None
+    source: Source
+    distance: float = 0.0
+
+    @classmethod
+    def from_result(cls, result: Result) -> Answer:
+        trajectory = np.column_stack((result.position, result.heading, result.roll))
+        return cls(result.time, trajectory, result.robustness, "simulation")
+
+    def trace(self, columns: typing.Sequence[int] = (0, 1, 2, 3, 4)) -> dict[float, list[float]]:
+        return {float(t): row[list(columns)].tolist() for t, row in zip(self.time, self.trajectory)}
+
+
+def _resample(answer: Answer, times: NDArray[np.float64]) -> NDArray[np.float64]:
+    # Trajectories that end before the last time are held at their final value. The heading is in
+    # degrees and is unwrapped so that it is not interpolated the long way around the circle.
+    columns = []
+
+    for index, name in enumerate(COLUMNS):
+        values = answer.trajectory[:, index]
+
+        if name == "heading":
+            values = np.unwrap(values, period=360)
+
+        columns.append(np.interp(times, answer.time, values))
+
+    return np.column_stack(columns)
+
+
+_MINIMUM_DISTANCE: typing.Final[float] = 1e-9
+
+
+class Surrogate:
+    """Inverse distance weighted estimates of simulations from already evaluated samples.
+
+    Samples are points in the box given by `bounds`, which maps the name of each static input to
+    its range, and distances are measured after scaling every range to the unit interval. A sample
+    is answered from its evaluated neighbours within `tolerance` of it, with their trajectories
+    resampled to the times of the nearest one and combined with weights proportional to the
+    inverse of their distance to the power `power`. The sample is simulated instead if it has no
+    neighbour within the tolerance, if the robustness of a neighbour is unknown, or if it is
+    borderline: its neighbours disagree on whether the specification is satisfied or the estimated
+    robustness is within `margin` of zero.
+
+    If the simulations are `stochastic`, a sample that was already evaluated is estimated like any
+    other instead of reusing the earlier answer, so it is still simulated again when borderline.
+    """
+
+    def __init__(
+        self,
+        bounds: typing.Mapping[str, tuple[float, float]],
+        *,
+        tolerance: float,
+        margin: float = 0.25,
+        neighbours: int = 4,
+        power: float = 2.0,
+        stochastic: bool = False,
+    ):
+        if not bounds:
+            raise ValueError("A surrogate needs at least one input")
+
+        self.names = tuple(bounds)
+        self.tolerance = tolerance
+        self.margin = margin
+        self.neighbours = neighbours
+        self.power = power
+        self.stochastic = stochastic
+        self.simulations = 0
+        self.estimates = 0
+        self._lower = np.array([bounds[name][0] for name in self.names], dtype=np.float64)
+        self._scale = np.array([bounds[name][1] - bounds[name][0] for name in self.names], dtype=np.float64)
+        self._scale[self._scale == 0] = 1.0
+        self._points: list[NDArray[np.float64]] = []
+        self._answers: list[Answer] = []
+        self._tree: cKDTree | None = None
+        self._lock = threading.Lock()
+        self._logger = logging.getLogger("surrogate")
+
+    def _point(self, sample: typing.Mapping[str, float]) -> NDArray[np.float64]:
+        values = np.array([sample[name] for name in self.names], dtype=np.float64)
+        return (values - self._lower) / self._scale
+
+    def _neighbours(self, point: NDArray[np.float64]) -> list[tuple[float, Answer]]:
+        with self._lock:
+            if not self._answers:
+                return []
+
+            # The tree cannot be extended, so it is rebuilt on the first query after an insertion
+            if self._tree is None:
+                self._tree = cKDTree(np.stack(self._points))
+
+            k = min(self.neighbours, len(self._answers))
+            distances, indices = self._tree.query(point, k=[*range(1, k + 1)], distance_upper_bound=self.tolerance)
+
+            return [
+                (float(distance), self._answers[index])
+                for distance, index in zip(distances, indices)
+                if np.isfinite(distance)
+            ]
+
+    def _estimate(self, neighbours: list[tuple[float, Answer]]) -> Answer | None:
+        nearest_distance, nearest = neighbours[0]
+
+        if any(len(answer.time) == 0 for _, answer in neighbours):
+            return None
+
+        if nearest_distance == 0.0 and not self.stochastic:
+            return dataclasses.replace(nearest, source="surrogate")
+
+        robustness = [answer.robustness for _, answer in neighbours]
+
+        if any(value is None for value in robustness):
+            return None
+
+        values = np.array(robustness, dtype=np.float64)
+
+        if np.any(values < 0) != np.all(values < 0):
+            return None
+
+        # Repeats of an evaluated sample have a distance of zero, so distances are bounded to give
+        # every repeat the same large weight.
+        distances = np.maximum([distance for distance, _ in neighbours], _MINIMUM_DISTANCE)
+        weights = distances ** -self.power
+        weights /= weights.sum()
+        times = nearest.time
+        resampled = np.stack([_resample(answer, times) for _, answer in neighbours])
+        trajectory = np.einsum("n,ntc->tc", weights, resampled)
+        heading = COLUMNS.index("heading")
+        radians = np.deg2rad(resampled[:, :, heading])
+        mean = np.arctan2(
+            np.einsum("n,nt->t", weights, np.sin(radians)),
+            np.einsum("n,nt->t", weights, np.cos(radians)),
+        )
+        degrees = np.rad2deg(mean) % 360
+        # Tiny negative angles round up to 360 in the modulo
+        trajectory[:, heading] = np.where(degrees >= 360, 0.0, degrees)
+
+        estimate = float(weights @ values)
+
+        if abs(estimate) <= self.margin:
+            return None
+
+        return Answer(times, trajectory, estimate, "surrogate", nearest_distance)
+
+    def add(self, sample: typing.Mapping[str, float], answer: Answer):
+        with self._lock:
+            self._points.append(self._point(sample))
+            self._answers.append(answer)
+            self._tree = None
+
+    def evaluate(self, sample: typing.Mapping[str, float], simulate: typing.Callable[[], Result]) -> Answer:
+        """Estimate the answer for `sample`, or call `simulate` if it is novel or borderline."""
+
+        neighbours = self._neighbours(self._point(sample))
+        answer = self._estimate(neighbours) if neighbours else None
+
+        if answer is not None:
+            self._logger.info(f"Estimated {dict(sample)} from {len(neighbours)} evaluated samples")
+
+            with self._lock:
+                self.estimates += 1
+
+            return answer
+
+        answer = Answer.from_result(simulate())
+        self.add(sample, answer)
+
+        with self._lock:
+            self.simulations += 1
+
+        return answer
@@ -16,12 +16,36 @@ import staliro.specifications.rtamt
 
 from controller.messages import Start, Result
 from controller.attacks import FixedSpeed, GaussianMagnet, SpeedController, Magnet
-from plots import Plot, plot
+from cache import Cache
+from plots import Plot, plot, render
+from executor import Executor, Slot
+from sessions import SessionExecutor
+from surrogate import Answer, Surrogate
 
 PORT: typing.Final[int] = 5556
 GZ_IMAGE: typing.Final[str] = "ghcr.io/cpslab-asu/ngc-rover-ha/gazebo:harmonic"
 GZ_BASE: typing.Final[pathlib.Path] = pathlib.Path("resources/worlds/default.sdf")
 GZ_WORLD: typing.Final[pathlib.Path] = pathlib.Path("/tmp/generated.sdf")
+FIRMWARE_IMAGE: typing.Final[str] = "ghcr.io/cpslab-asu/ngc-rover-ha/controller:latest"
+
+
+def start(
+    world: str,
+    magnet: Magnet | None,
+    speed: SpeedController | None,
+    freq: int,
+    spec: str | None = None,
+    stop_on_violation: bool = False,
+) -> Start:
+    return Start(
+        world,
+        freq,
+        magnet,
+        speed,
+        commands=itertools.repeat(None),
+        spec=spec,
+        stop_on_violation=stop_on_violation,
+    )
 
 
 def firmware(*, verbose: bool):
@@ -31,106 +55,237 @@ def firmware(*, verbose: bool):
         prefix = f"{prefix} --verbose"
 
     @gzcm.manage(
-        firmware_image="ghcr.io/cpslab-asu/ngc-rover-ha/controller:latest",
-        gazebo_image="ghcr.io/cpslab-asu/ngc-rover-ha/gazebo:harmonic",
+        firmware_image=FIRMWARE_IMAGE,
+        gazebo_image=GZ_IMAGE,
         command=f"{prefix} serve --port {PORT}",
         port=PORT,
         rtype=Result,
     )
-    def inner(world: str, magnet: Magnet | None, speed: SpeedController | None, freq: int) -> Start:
-        return Start(world, freq, magnet, speed, commands=itertools.repeat(None))
+    def inner(
+        world: str,
+        magnet: Magnet | None,
+        speed: SpeedController | None,
+        freq: int,
+        spec: str | None = None,
+        stop_on_violation: bool = False,
+    ) -> Start:
+        return start(world, magnet, speed, freq, spec, stop_on_violation)
+
+    return inner
+
+
+def executor(ctx: click.Context) -> Executor | SessionExecutor:
+    """Use the sessions endpoint if one is given, otherwise start a pair of containers per worker."""
+
+    address = ctx.obj["sessions"]
+    world = ctx.obj["world"]
+
+    if address is not None:
+        return SessionExecutor(address, lambda **kwargs: start(world, **kwargs))
+
+    def slot() -> Slot:
+        return Slot(
+            GZ_IMAGE,
+            FIRMWARE_IMAGE,
+            world=world,
+            base=GZ_BASE,
+            port=PORT,
+            start=lambda **kwargs: start(world, **kwargs),
+            verbose=ctx.obj["verbose"],
+        )
+
+    return Executor(ctx.obj["workers"], slot)
+
+
+def cached(ctx: click.Context, run: typing.Callable[..., Result]) -> typing.Callable[..., Result]:
+    """Wrap a simulation function to reuse the stored result of identical simulations.
+
+    The `Start` message used for the cache key is built from the keyword arguments given to the
+    wrapped function and the world of the harness. The world itself is part of the gazebo image,
+    whose id is part of the key.
+    """
+
+    cache: Cache | None = ctx.obj["cache"]
+
+    if cache is None:
+        return run
+
+    def inner(**kwargs: typing.Any) -> Result:
+        msg = start(ctx.obj["world"], **kwargs)
+        return cache.run(msg, lambda: run(**kwargs))
 
     return inner
 
 
+def surrogate(
+    ctx: click.Context,
+    bounds: typing.Mapping[str, tuple[float, float]],
+    *,
+    stochastic: bool = False,
+) -> Surrogate | None:
+    tolerance = ctx.obj["tolerance"]
+    return Surrogate(bounds, tolerance=tolerance, stochastic=stochastic) if tolerance > 0 else None
+
+
+def evaluate(
+    surrogate: Surrogate | None,
+    sample: typing.Mapping[str, float],
+    simulate: typing.Callable[[], Result],
+) -> Answer:
+    """Answer a sample from the surrogate if there is one, otherwise always simulate it."""
+
+    if surrogate is None:
+        return Answer.from_result(simulate())
+
+    return surrogate.evaluate(sample, simulate)
+
+
+def summarize(surrogate: Surrogate | None):
+    if surrogate is not None:
+        print(f"Ran {surrogate.simulations} simulations and {surrogate.estimates} surrogate estimates")
+
+
+def parallelism(ctx: click.Context) -> int | None:
+    workers = ctx.obj["workers"]
+    return workers if workers > 1 else None
+
+
 @click.group()
 @click.option("-v", "--verbose", is_flag=True)
+@click.option("-k", "--workers", type=click.IntRange(min=1), default=1, help="Number of simulations to run concurrently")
+@click.option("--no-cache", is_flag=True, help="Always simulate instead of reusing stored results")
+@click.option("--cache-size", type=click.IntRange(min=1), default=1024, help="Maximum size of the result cache in MiB")
+@click.option(
+    "--tolerance",
+    type=click.FloatRange(min=0),
+    default=0.0,
+    help="Estimate samples within this normalized distance of evaluated ones instead of simulating them (0 disables)",
+)
+@click.option(
+    "--sessions",
+    default=None,
+    help="Address of a running 'controller sessions' endpoint to send simulations to, like tcp://localhost:5558",
+)
+@click.option("--world", default="default", help="Name of the Gazebo world the simulations run in")
 @click.pass_context
-def test(ctx: click.Context, verbose: bool):
+def test(
+    ctx: click.Context,
+    verbose: bool,
+    workers: int,
+    no_cache: bool,
+    cache_size: int,
+    tolerance: float,
+    sessions: str | None,
+    world: str,
+):
     if verbose:
         logging.basicConfig(level=logging.INFO)
 
     ctx.ensure_object(dict)
     ctx.obj["verbose"] = verbose
+    ctx.obj["workers"] = workers
+    ctx.obj["tolerance"] = tolerance
+    ctx.obj["sessions"] = sessions
+    ctx.obj["world"] = world
+    ctx.obj["cache"] = None if no_cache else Cache(
+        [FIRMWARE_IMAGE, GZ_IMAGE],
+        max_bytes=cache_size * 1024 * 1024,
+    )
 
 
 @test.command()
 @click.pass_context
 def cpv1(ctx: click.Context):
-    firmware_ = firmware(verbose=ctx.obj["verbose"])
+    executor_ = executor(ctx)
+    simulate = cached(ctx, executor_.run)
+    req = "always (x >= 0)"
+    static_inputs = {
+        "speed": (2, 50),
+    }
+    surrogate_ = surrogate(ctx, static_inputs)
 
     @staliro.models.model()
-    def model(sample: staliro.Sample) -> staliro.Trace[list[float]]:
-        gazebo = gzcm.Gazebo()
+    def model(sample: staliro.Sample) -> staliro.Result[staliro.Trace[list[float]], str]:
         speed = FixedSpeed(sample.static["speed"])
-        result = firmware_.run(gazebo, freq=1, magnet=None, speed=speed)
-        trace = {
-            step.time: [
-                step.position[0],
-                step.position[1],
-                step.position[2],
-                step.heading,
-                step.roll,
-            ]
-            for step in result
-        }
-
-        return staliro.Trace(trace)
-
-    spec = staliro.specifications.rtamt.parse_dense("always (x >= 0)", { "x": 0, "y": 1, "z": 2, "theta": 3, "omega": 4})
+        # The specification is monitored by the controller when the surrogate needs the robustness
+        monitored = req if surrogate_ is not None else None
+        answer = evaluate(surrogate_, sample.static, lambda: simulate(freq=1, magnet=None, speed=speed, spec=monitored))
+
+        return staliro.Result(staliro.Trace(answer.trace()), answer.source)
+
+    spec = staliro.specifications.rtamt.parse_dense(req, { "x": 0, "y": 1, "z": 2, "theta": 3, "omega": 4})
     opt = staliro.optimizers.UniformRandom() # TODO: replace with SOAR
     opts = staliro.TestOptions(
         runs=1,
         iterations=10,
-        static_inputs={
-            "speed": (2, 50),
-        },
+        static_inputs=static_inputs,
         signals={},
+        threads=parallelism(ctx),
     )
-    runs = staliro.test(model, spec, opt, opts)
+
+    with executor_:
+        runs = staliro.test(model, spec, opt, opts)
+
     run = runs[0]  # We know there is only a single run, so just extract it
     eval = run.evaluations[0]  # Extract the first sample generated by the optimizer
 
     print(eval)
+    summarize(surrogate_)
 
 
 @test.command()
 @click.pass_context
-def cpv2(ctx: click.Context):
-    gazebo = gzcm.Gazebo()
-    firmware_ = firmware(verbose=ctx.obj["verbose"])
+@click.option("--early-stop", is_flag=True, help="Stop each simulation once the requirement is violated")
+@click.option("-o", "--output", type=click.Path(dir_okay=False), default=None, help="Write the plot to a PNG or SVG file")
+@click.option(
+    "--report",
+    type=click.Path(file_okay=False),
+    default=None,
+    help="Write an overview and a figure for every evaluation to this directory, using --workers processes",
+)
+@click.option(
+    "--plot-tolerance",
+    type=click.FloatRange(min=0),
+    default=0.0,
+    help="Drop trajectory points within this many meters of the drawn line",
+)
+def cpv2(ctx: click.Context, early_stop: bool, output: str | None, report: str | None, plot_tolerance: float):
+    executor_ = executor(ctx)
+    simulate = cached(ctx, executor_.run)
+    req = "always (x >= 0 and x <= 8.0 and y >= 0 and y <= 8.0)"
+    static_inputs = {
+        "x": (0, 8),
+        "y": (0, 8),
+    }
+    surrogate_ = surrogate(ctx, static_inputs, stochastic=True)
 
     @staliro.models.model()
-    def model(sample: staliro.Sample) -> staliro.Result[staliro.Trace[list[float]], int]:
+    def model(sample: staliro.Sample) -> staliro.Result[staliro.Trace[list[float]], tuple[int, str]]:
         speed = FixedSpeed(sample.static["speed"])
         seed = rand.randint(0, sys.maxsize - 1)
         magnet=GaussianMagnet(sample.static["x"], sample.static["y"], rng=rand.default_rng(seed))
-        result = firmware_.run(gazebo, freq=1, magnet=magnet, speed=speed)
-        trace = {
-            step.time: [
-                step.position[0],
-                step.position[1],
-                step.position[2],
-                step.heading,
-                step.roll,
-            ]
-            for step in result.history
-        }
-
-        return staliro.Result(staliro.Trace(trace), seed)
-
-    req ="always (x >= 0 and x <= 8.0 and y >= 0 and y <= 8.0)"
+        answer = evaluate(
+            surrogate_,
+            sample.static,
+            lambda: simulate(freq=1, magnet=magnet, speed=speed, spec=req, stop_on_violation=early_stop),
+        )
+
+        # The seed only applies to answers from a simulation
+        return staliro.Result(staliro.Trace(answer.trace()), (seed, answer.source))
+
     spec = staliro.specifications.rtamt.parse_dense(req, {"x": 0, "y": 1})
     opt = staliro.optimizers.DualAnnealing()
     opts = staliro.TestOptions(
         runs=1,
         iterations=5,
-        static_inputs={
-            "x": (0, 8),
-            "y": (0, 8),
-        },
+        static_inputs=static_inputs,
+        threads=parallelism(ctx),
     )
-    runs = staliro.test(model, spec, opt, opts)
+
+    with executor_:
+        runs = staliro.test(model, spec, opt, opts)
+        ground_truth = simulate(freq=5, magnet=None, speed=FixedSpeed(5.0))
+
     run = runs[0]  # We know there is only a single run, so just extract it
     worst = min(run.evaluations, key=lambda e: e.cost)  # Extract the first sample generated by the optimizer
     worst_plot = Plot(worst.extra.trace, (worst.sample.static["x"], worst.sample.static["y"]), color="r")
@@ -138,7 +293,6 @@ def cpv2(ctx: click.Context):
         Plot(e.extra.trace, (e.sample.static["x"], e.sample.static["y"]))
         for e in run.evaluations
     ]
-    ground_truth = firmware_.run(gazebo, freq=5, magnet=None, speed=FixedSpeed(5.0))
     ground_truth_plot = Plot(
         magnet=None,
         trajectory=staliro.Trace({
@@ -147,7 +301,16 @@ def cpv2(ctx: click.Context):
         color="g",
     )
 
-    plot(*plots, worst_plot, ground_truth_plot)
+    if report is not None:
+        directory = pathlib.Path(report)
+        directory.mkdir(parents=True, exist_ok=True)
+        figures = {directory / "overview.png": [*plots, worst_plot, ground_truth_plot]}
+        figures.update({directory / f"evaluation_{i:04d}.png": [p, ground_truth_plot] for i, p in enumerate(plots)})
+        render(figures, tolerance=plot_tolerance, workers=ctx.obj["workers"])
+    else:
+        plot(*plots, worst_plot, ground_truth_plot, output=output, tolerance=plot_tolerance)
+
+    summarize(surrogate_)
 
 
 @test.command()
@@ -160,7 +323,21 @@ def cpv3():
 @click.option("-f", "--frequency", "freq", type=int, default=2)
 @click.option("-s", "--speed", type=float, default=5.0)
 @click.option("-m", "--magnet", type=float, nargs=2, default=None)
-def simulation(ctx: click.Context, speed: float, freq: int, magnet: tuple[float, float] | None):
+@click.option("-o", "--output", type=click.Path(dir_okay=False), default=None, help="Write the plot to a PNG or SVG file")
+@click.option(
+    "--plot-tolerance",
+    type=click.FloatRange(min=0),
+    default=0.0,
+    help="Drop trajectory points within this many meters of the drawn line",
+)
+def simulation(
+    ctx: click.Context,
+    speed: float,
+    freq: int,
+    magnet: tuple[float, float] | None,
+    output: str | None,
+    plot_tolerance: float,
+):
     if magnet:
         rng = rand.default_rng()
         magnet_ = GaussianMagnet(x=magnet[0], y=magnet[1], rng=rng)
@@ -169,7 +346,8 @@ def simulation(ctx: click.Context, speed: float, freq: int, magnet: tuple[float,
 
     gazebo = gzcm.Gazebo()
     firmware_ = firmware(verbose=ctx.obj["verbose"])
-    result = firmware_.run(gazebo, freq=freq, magnet=magnet_, speed=FixedSpeed(speed))
+    simulate = cached(ctx, lambda **kwargs: firmware_.run(gazebo, **kwargs))
+    result = simulate(freq=freq, magnet=magnet_, speed=FixedSpeed(speed))
     p = Plot(
         magnet=magnet,
         trajectory=staliro.Trace({
@@ -177,7 +355,7 @@ def simulation(ctx: click.Context, speed: float, freq: int, magnet: tuple[float,
         }),
     )
 
-    plot(p)
+    plot(p, output=output, tolerance=plot_tolerance)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,7 @@
+import pathlib
+import sys
+
+ROOT = pathlib.Path(__file__).parent.parent
+
+# The harness modules are scripts in src that import the controller package from its source tree
+sys.path[:0] = [str(ROOT / "src"), str(ROOT / "controller" / "src")]
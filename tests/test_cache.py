@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+pytest.importorskip("docker")
+
+from cache import Cache
+from controller.messages import Result
+
+
+def _result() -> Result:
+    time = np.arange(3, dtype=np.float64)
+
+    return Result(
+        time=time,
+        position=np.zeros((3, 3)),
+        heading=np.zeros(3),
+        roll=np.zeros(3),
+        state=np.ones(3, dtype=np.uint8),
+        state_rows=np.zeros(1, dtype=np.uint32),
+        state_parameters=np.zeros((1, 3)),
+        robustness=1.0,
+    )
+
+
+def test_roundtrip(tmp_path):
+    cache = Cache([], directory=tmp_path)
+    cache.put("key", _result())
+    result = cache.get("key")
+
+    assert result is not None
+    assert result.robustness == 1.0
+
+
+@pytest.mark.parametrize("length", [0, 4, 20])
+def test_unreadable_entry_is_a_miss(tmp_path, length):
+    cache = Cache([], directory=tmp_path)
+    cache.put("key", _result())
+    path = tmp_path / "key.ngcr"
+    path.write_bytes(path.read_bytes()[:length])
+
+    assert cache.get("key") is None
+    assert not path.exists()
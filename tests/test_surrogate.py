@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from controller.messages import Result
+from surrogate import Answer, Surrogate
+
+
+def _result(heading: float, robustness: float, steps: int = 5) -> Result:
+    time = np.arange(steps, dtype=np.float64)
+    position = np.column_stack((time, time, np.zeros(steps)))
+
+    return Result(
+        time=time,
+        position=position,
+        heading=np.full(steps, heading),
+        roll=np.zeros(steps),
+        state=np.ones(steps, dtype=np.uint8),
+        state_rows=np.zeros(1, dtype=np.uint32),
+        state_parameters=np.zeros((1, 3)),
+        robustness=robustness,
+    )
+
+
+def _surrogate(*samples: tuple[float, Result]) -> Surrogate:
+    surrogate = Surrogate({"x": (0.0, 1.0)}, tolerance=0.1)
+
+    for x, result in samples:
+        surrogate.add({"x": x}, Answer.from_result(result))
+
+    return surrogate
+
+
+def _estimate(surrogate: Surrogate, x: float) -> Answer:
+    def simulate() -> Result:
+        raise AssertionError("Sample should have been estimated")
+
+    answer = surrogate.evaluate({"x": x}, simulate)
+    assert answer.source == "surrogate"
+
+    return answer
+
+
+def test_identical_headings_are_kept():
+    surrogate = _surrogate((0.48, _result(350.0, 1.0)), (0.52, _result(350.0, 1.0)))
+    answer = _estimate(surrogate, 0.5)
+
+    np.testing.assert_allclose(answer.trajectory[:, 3], 350.0)
+
+
+@pytest.mark.parametrize(("first", "second", "expected"), [(350.0, 10.0, 0.0), (340.0, 0.0, 350.0), (5.0, 355.0, 0.0)])
+def test_headings_are_averaged_across_north(first: float, second: float, expected: float):
+    surrogate = _surrogate((0.48, _result(first, 1.0)), (0.52, _result(second, 1.0)))
+    answer = _estimate(surrogate, 0.5)
+    headings = answer.trajectory[:, 3]
+
+    # The difference is wrapped so that 359.99... and 0 compare equal
+    np.testing.assert_allclose((headings - expected + 180.0) % 360.0 - 180.0, 0.0, atol=1e-9)
+    assert np.all((headings >= 0.0) & (headings < 360.0))
+
+
+def test_heading_is_interpolated_across_north():
+    times = np.arange(3, dtype=np.float64)
+    answer = Answer(times, np.column_stack((times, times, times, [350.0, 10.0, 30.0], times)), 1.0, "simulation")
+    surrogate = _surrogate()
+    surrogate.add({"x": 0.48}, answer)
+    surrogate.add({"x": 0.52}, answer)
+
+    # Resampling to the times of the nearest neighbour keeps its headings, without passing 180
+    estimate = _estimate(surrogate, 0.5)
+    np.testing.assert_allclose(estimate.trajectory[:, 3], [350.0, 10.0, 30.0], atol=1e-9)
+
+
+def test_borderline_samples_are_simulated():
+    surrogate = _surrogate((0.48, _result(0.0, 1.0)), (0.52, _result(0.0, -1.0)))
+    calls = []
+
+    answer = surrogate.evaluate({"x": 0.5}, lambda: calls.append(None) or _result(0.0, 0.5))
+
+    assert answer.source == "simulation"
+    assert calls
+
+
+def test_novel_samples_are_simulated():
+    surrogate = _surrogate((0.1, _result(0.0, 1.0)))
+    answer = surrogate.evaluate({"x": 0.9}, lambda: _result(0.0, 2.0))
+
+    assert answer.source == "simulation"
+    assert surrogate.simulations == 1